@@ -47,11 +47,17 @@ class TelegramAdapter:
         self._last_menu_msg_id: dict[int, int] = {}
         # per-chat lock to serialize delete→post across concurrent sends
         self._menu_locks: dict[int, asyncio.Lock] = {}
+        # The menu has only two shapes; build both keyboards once and reuse them
+        self._menu_kb: dict[bool, InlineKeyboardMarkup] = {
+            flag: self.build_menu_keyboard(can_confirm=flag) for flag in (True, False)
+        }
 
         # ---- Handlers (IMPORTANT: commands first, then generic text) ----
         self.dp.message.register(self.on_start, CommandStart())
         self.dp.message.register(self.on_ids, Command("ids"))
         self.dp.message.register(self.on_group_text, F.text)
+        # Anything else (photo, sticker, voice, …) still pushes the menu up
+        self.dp.message.register(self.on_group_other)
         self.dp.callback_query.register(self.on_callback, F.data.startswith("ui:"))
 
     # ------------------------------------------------------------------------------
@@ -92,23 +98,29 @@ class TelegramAdapter:
     async def post_menu(self, chat_id: int, text: str, *, can_confirm: bool) -> int:
         lock = self._menu_locks.setdefault(chat_id, asyncio.Lock())
         async with lock:
-            old = self._last_menu_msg_id.get(chat_id)
-            if old:
-                try:
-                    await self.bot.delete_message(chat_id, old)
-                except Exception as e:
-                    self.log.debug(
-                        "menu.delete.fail " + kv(chat_id=chat_id, err=str(e))
-                    )
+            await self._delete_menu_locked(chat_id)
 
-            kb = self.build_menu_keyboard(can_confirm=can_confirm)
             msg = await self.bot.send_message(
-                chat_id=chat_id, text=text, reply_markup=kb
+                chat_id=chat_id, text=text, reply_markup=self._menu_kb[can_confirm]
             )
 
             self._last_menu_msg_id[chat_id] = msg.message_id
             return msg.message_id
 
+    async def delete_menu(self, chat_id: int) -> None:
+        """Delete the current menu now (lets callers overlap it with other sends)."""
+        lock = self._menu_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            await self._delete_menu_locked(chat_id)
+
+    async def _delete_menu_locked(self, chat_id: int) -> None:
+        old = self._last_menu_msg_id.pop(chat_id, None)
+        if old:
+            try:
+                await self.bot.delete_message(chat_id, old)
+            except Exception as e:
+                self.log.debug("menu.delete.fail %s", kv(chat_id=chat_id, err=str(e)))
+
     # ------------------------------------------------------------------------------
     # Reply keyboard removal — done on /start (separate message)
     # ------------------------------------------------------------------------------
@@ -126,9 +138,20 @@ class TelegramAdapter:
     # ------------------------------------------------------------------------------
     # Handlers
     # ------------------------------------------------------------------------------
+    def _message_below_menu(self, chat_id: int) -> None:
+        """
+        An inbound message now sits below the menu, so the next send_menu must
+        re-post it. Every group handler that does not reach
+        engine.on_patient_message (which forgets on its own) calls this.
+        """
+        if chat_id in self.patient_groups:
+            self.engine.messenger.forget_menu(chat_id)
+
     async def on_start(self, message: Message) -> None:
         chat_id = message.chat.id
         await self.clear_reply_keyboard_once(chat_id)
+        # /start and the keyboard-removal line both sit below the old menu
+        self._message_below_menu(chat_id)
         await self.engine.show_current_menu(chat_id)
 
     async def on_group_text(self, message: Message) -> None:
@@ -147,12 +170,12 @@ class TelegramAdapter:
                 return
 
         self.log.info(
-            "msg.in.group "
-            + kv(group_id=chat_id, sender_user_id=sender_user_id, text=text)
+            "msg.in.group %s",
+            kv(group_id=chat_id, sender_user_id=sender_user_id, text=text)
         )
 
         if chat_id not in self.patient_groups:
-            self.log.debug("msg.in.ignored " + kv(reason="not a patient group"))
+            self.log.debug("msg.in.ignored %s", kv(reason="not a patient group"))
             return
 
         sent_at_utc = getattr(message, "date", None)
@@ -170,6 +193,10 @@ class TelegramAdapter:
 
         await self.engine.on_patient_message(incoming)
 
+    async def on_group_other(self, message: Message) -> None:
+        """Non-text message: nothing to dispatch, but the menu is no longer last."""
+        self._message_below_menu(message.chat.id)
+
     async def on_callback(self, callback: CallbackQuery) -> None:
         """
         Flat UI actions:
@@ -197,8 +224,8 @@ class TelegramAdapter:
                 )
             # Log at INFO so it's visible in default console output
             self.log.info(
-                "cb.ignored.nonpatient "
-                + kv(
+                "cb.ignored.nonpatient %s",
+                kv(
                     group_id=chat_id,
                     actor=from_user_id,
                     expected=expected_pid,
@@ -235,6 +262,8 @@ class TelegramAdapter:
         Debug command: /ids prints group id and best-effort participants to console only.
         No chat output, no menu refresh or deletions.
         """
+        # The /ids message itself still lands below the menu
+        self._message_below_menu(message.chat.id)
         try:
             known_ids: set[int] = set()
             chat_id = message.chat.id
@@ -245,8 +274,7 @@ class TelegramAdapter:
             patient_id = pid_mapping.get(chat_id)
             if isinstance(patient_id, int):
                 known_ids.add(patient_id)
-                pdata = pat_idx.get(patient_id, {})
-                nurse_id = pdata.get("nurse_user_id")
+                nurse_id = getattr(pat_idx.get(patient_id), "nurse_user_id", None)
                 if isinstance(nurse_id, int):
                     known_ids.add(nurse_id)
 
@@ -254,7 +282,7 @@ class TelegramAdapter:
                 self.bot, message, known_user_ids=list(known_ids)
             )
         except Exception as e:
-            self.log.debug("ids.print.fail " + kv(err=str(e)))
+            self.log.debug("ids.print.fail %s", kv(err=str(e)))
         # Intentionally do nothing in chat (no reply).
 
     # ------------------------------------------------------------------------------
@@ -263,14 +291,14 @@ class TelegramAdapter:
     async def send_group_message(
         self, group_id: int, text: str, reply_markup: Any | None = None
     ) -> int:
-        self.log.info("msg.out.group " + kv(group_id=group_id, text=text))
+        self.log.info("msg.out.group %s", kv(group_id=group_id, text=text))
         msg = await self.bot.send_message(
             chat_id=group_id, text=text, reply_markup=reply_markup
         )
         return msg.message_id
 
     async def send_nurse_dm(self, user_id: int, text: str) -> None:
-        self.log.info("msg.out.dm " + kv(user_id=user_id, text=text))
+        self.log.info("msg.out.dm %s", kv(user_id=user_id, text=text))
         await self.bot.send_message(chat_id=user_id, text=text)
 
     # v4 menu hook used by ReminderMessenger
@@ -282,7 +310,11 @@ class TelegramAdapter:
     async def run_polling(self) -> None:
         self.log.debug("polling.run")
         await self.bot.delete_webhook(drop_pending_updates=True)
-        await self.dp.start_polling(self.bot)
+        # Only subscribe to update types that have registered handlers
+        # (message + callback_query); Telegram won't send the rest at all.
+        await self.dp.start_polling(
+            self.bot, allowed_updates=self.dp.resolve_used_update_types()
+        )
 
 
 __all__ = [
@@ -4,8 +4,9 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 import asyncio
+import dataclasses
 import logging
-from typing import List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple
 from datetime import datetime
 
 # --------------------------------------------------------------------------------------
@@ -15,8 +16,10 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-import config as cfg  # noqa: E402
-from config import get_bot_token, PATIENTS  # noqa: E402
+import pillsbot.config as cfg  # noqa: E402
+from pillsbot.config import get_bot_token, PATIENTS  # noqa: E402
+from pillsbot.core.config_validation import Patient, validate_config  # noqa: E402
+from pillsbot.core.csv_writer import ensure_parent_dirs  # noqa: E402
 from pillsbot.core.reminder_engine import ReminderEngine  # noqa: E402
 from pillsbot.adapters.telegram_adapter import TelegramAdapter  # noqa: E402
 from apscheduler.schedulers.asyncio import AsyncIOScheduler  # noqa: E402
@@ -43,6 +46,21 @@ async def schedule_jobs(
 
     immediate: List[Tuple[int, str]] = []
 
+    # Day rotation: pre-create the new day and drop the old one. Jobs due at the same
+    # instant run in id order, so a 00:00 dose may fire first; _start_dose_job then
+    # creates the instances itself.
+    sched.add_job(
+        engine._job_rotate_day,
+        trigger="cron",
+        hour=0,
+        minute=0,
+        id="rotate_day",
+        replace_existing=True,
+        coalesce=True,
+        misfire_grace_time=300,
+        max_instances=1,
+    )
+
     # Doses
     for p in PATIENTS:
         pid = p["patient_id"]
@@ -94,24 +112,22 @@ async def schedule_jobs(
 
 
 def _patients_with_star_replaced(
-    patients: List[Dict[str, Any]], hhmm: str
-) -> List[Dict[str, Any]]:
+    patients: Iterable[Patient], hhmm: str
+) -> List[Patient]:
     """
-    Return a shallow-copied PATIENTS where any dose with time=='*' is replaced by HH:MM.
+    Return a copy of the roster where any dose with time=='*' is replaced by HH:MM.
     This guarantees engine/state initialization pre-creates today's instances.
     """
-    result: List[Dict[str, Any]] = []
-    for p in patients:
-        newp = dict(p)
-        new_doses: List[Dict[str, Any]] = []
-        for d in p.get("doses", []):
-            if d.get("time") == "*":
-                d = dict(d)
-                d["time"] = hhmm
-            new_doses.append(d)
-        newp["doses"] = new_doses
-        result.append(newp)
-    return result
+    return [
+        dataclasses.replace(
+            p,
+            doses=tuple(
+                dataclasses.replace(d, time=hhmm, once=True) if d.time == "*" else d
+                for d in p.doses
+            ),
+        )
+        for p in patients
+    ]
 
 
 async def main() -> None:
@@ -119,36 +135,36 @@ async def main() -> None:
     log = logging.getLogger("pillsbot.app")
 
     token = get_bot_token()
+    settings = validate_config(cfg)
+    # Create every log directory once up front (deduplicated across CSV paths)
+    ensure_parent_dirs(
+        [settings.log_file, settings.audit_log_file]
+        + [m.csv_file for m in settings.measures.values()]
+    )
 
-    # Break constructor cycle: adapter needs engine, engine needs adapter
+    # Compute a single HH:MM substitute for all '*' doses at this startup;
+    # the engine gets a roster with '*' replaced so state pre-creates instances.
+    now_hhmm = _now_hhmm(settings.tz)
+    settings = dataclasses.replace(
+        settings,
+        patients=tuple(_patients_with_star_replaced(settings.patients, now_hhmm)),
+    )
+
+    # Break constructor cycle: engine starts with a null sink, adapter gets the
+    # real engine, then the adapter is swapped in as the engine's sink.
+    engine = ReminderEngine(config=settings)
     adapter = TelegramAdapter(
         bot_token=token,
-        engine=None,  # placeholder; set real engine below
+        engine=engine,
         patient_groups=[p["group_id"] for p in PATIENTS],
     )
-
-    engine = ReminderEngine(config=cfg, adapter=adapter)
-
-    # Attach engine back to adapter
-    if hasattr(adapter, "attach_engine"):
-        adapter.attach_engine(engine)
-    else:
-        adapter.engine = engine  # type: ignore[attr-defined]
+    engine.attach_adapter(adapter)
 
     # Prepare scheduler and register jobs (do not start yet)
-    sched, immediate = await schedule_jobs(engine, timezone=cfg.TZ)
-
-    # Compute a single HH:MM substitute for all '*' doses at this startup
-    now_hhmm = _now_hhmm(cfg.TZ)
+    sched, immediate = await schedule_jobs(engine, timezone=settings.tz)
 
-    # Temporarily replace '*' with now_hhmm so engine/state pre-creates instances
-    original_patients = cfg.PATIENTS
-    try:
-        cfg.PATIENTS = _patients_with_star_replaced(original_patients, now_hhmm)
-        # Initialize engine (explicitly disable any legacy scheduler passthrough)
-        await engine.start(scheduler=None)
-    finally:
-        cfg.PATIENTS = original_patients
+    # Initialize engine (explicitly disable any legacy scheduler passthrough)
+    await engine.start(scheduler=None)
 
     # --- IMPORTANT ORDER ---
     # 1) Startup greeting (one per group) BEFORE any reminders can publish
@@ -165,7 +181,10 @@ async def main() -> None:
     log.info("startup.ready patients=%d", len(PATIENTS))
 
     # Enter polling loop
-    await adapter.run_polling()
+    try:
+        await adapter.run_polling()
+    finally:
+        await engine.aclose()
 
 
 if __name__ == "__main__":
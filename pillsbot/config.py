@@ -5,6 +5,7 @@ All times for scheduling/logging are Europe/Kyiv.
 
 from __future__ import annotations
 
+import functools
 import os
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -15,7 +16,14 @@ from zoneinfo import ZoneInfo
 # IMPORTANT: no hardcoded token in repo; provide via env or explicit override
 BOT_TOKEN: str | None = None
 TIMEZONE = "Europe/Kyiv"
-TZ = ZoneInfo(TIMEZONE)
+
+
+@functools.lru_cache(maxsize=None)
+def _tz(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+TZ = _tz(TIMEZONE)
 
 # Retry/escalation configuration
 RETRY_INTERVAL_S = 60
@@ -1,63 +1,235 @@
 # pillsbot/core/config_validation.py
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Final
+from zoneinfo import ZoneInfo
 import re
 
+from pillsbot.core.matcher import (
+    compile_confirm_gate,
+    compile_confirm_re,
+    split_confirm_patterns,
+)
+from pillsbot.core.measurements import PARSERS_BY_KIND, MeasureDef
 
-_TIME_RE = re.compile(r"^\d{2}:\d{2}$")
+
+_REQUIRED_PATIENT_FIELDS: Final[frozenset[str]] = frozenset(
+    {"patient_id", "patient_label", "group_id", "nurse_user_id", "doses"}
+)
+_REQUIRED_DOSE_FIELDS: Final[frozenset[str]] = frozenset({"time", "text"})
+_ANY_TIME: Final = "*"  # dose fires once right after startup
 
 
 def _is_valid_hhmm(s: str) -> bool:
-    if not _TIME_RE.match(s):
-        return False
-    hh, mm = (int(x) for x in s.split(":", 1))
-    return 0 <= hh <= 23 and 0 <= mm <= 59
+    # Fixed "HH:MM" shape: slice checks instead of a regex or strptime
+    return (
+        isinstance(s, str)
+        and len(s) == 5
+        and s[2] == ":"
+        and s.isascii()
+        and s[:2].isdigit()
+        and s[3:].isdigit()
+        and int(s[:2]) <= 23
+        and int(s[3:]) <= 59
+    )
+
+
+class _ItemAccess:
+    """Read-only dict-style access (`p["group_id"]`, `p.get(...)`) for code written
+    against the raw config dicts."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
+def _first_duplicate(items: list[str]) -> str | None:
+    # Common case (no duplicates) is one set build + length compare
+    if len(items) == len(set(items)):
+        return None
+    seen: set[str] = set()
+    for x in items:
+        if x in seen:
+            return x
+        seen.add(x)
+    return None
 
 
-def validate_config(cfg: Any) -> None:
+@dataclass(frozen=True, slots=True)
+class Dose(_ItemAccess):
+    time: str  # HH:MM or '*'
+    text: str
+    once: bool = False  # '*' dose pinned to the startup HH:MM; not re-created later
+
+
+@dataclass(frozen=True, slots=True)
+class MeasurementCheck(_ItemAccess):
+    measure_id: str
+    time: str  # HH:MM
+
+
+@dataclass(frozen=True, slots=True)
+class Patient(_ItemAccess):
+    patient_id: int
+    patient_label: str
+    group_id: int
+    nurse_user_id: int
+    doses: tuple[Dose, ...]
+    measurement_checks: tuple[MeasurementCheck, ...] = ()
+
+    @classmethod
+    def from_dict(cls, p: Any) -> "Patient":
+        if isinstance(p, Patient):
+            return p
+        return cls(
+            patient_id=p["patient_id"],
+            patient_label=p["patient_label"],
+            group_id=p["group_id"],
+            nurse_user_id=p["nurse_user_id"],
+            doses=tuple(Dose(time=d["time"], text=d["text"]) for d in p["doses"]),
+            measurement_checks=tuple(
+                MeasurementCheck(measure_id=c["measure_id"], time=c["time"])
+                for c in p.get("measurement_checks", ())
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Frozen snapshot of the runtime settings the engine reads on the hot path.
+    Built once from the config module (or any object with the same attributes).
+    """
+
+    tz: ZoneInfo
+    retry_interval_s: int
+    max_retry_attempts: int
+    confirm_patterns: tuple[str, ...]
+    confirm_literals: frozenset[str]  # whole-message literal patterns, casefolded
+    confirm_re: re.Pattern[str] | None  # union of the remaining real regexes
+    confirm_gate: re.Pattern[str] | None  # char-class prefilter for confirm_re
+    measures: dict[str, MeasureDef]  # parser callables resolved at load time
+    patients: tuple[Patient, ...]
+    log_file: str
+    audit_log_file: str
+
+
+def load_config(cfg: Any) -> Config:
+    """Snapshot `cfg` into a Config without validating (missing attrs → defaults)."""
+    if isinstance(cfg, Config):
+        return cfg
+    tz = getattr(cfg, "TZ", None) or ZoneInfo(getattr(cfg, "TIMEZONE", "Europe/Kyiv"))
+    confirm_patterns = tuple(getattr(cfg, "CONFIRM_PATTERNS", None) or ())
+    literals, residual = split_confirm_patterns(confirm_patterns)
+    return Config(
+        tz=tz,
+        retry_interval_s=int(getattr(cfg, "RETRY_INTERVAL_S", 30)),
+        max_retry_attempts=int(getattr(cfg, "MAX_RETRY_ATTEMPTS", 3)),
+        confirm_patterns=confirm_patterns,
+        confirm_literals=literals,
+        confirm_re=compile_confirm_re(residual) if residual else None,
+        confirm_gate=compile_confirm_gate(residual),
+        measures={
+            mid: MeasureDef.from_config(mid, m)
+            for mid, m in (getattr(cfg, "MEASURES", None) or {}).items()
+        },
+        patients=tuple(
+            Patient.from_dict(p) for p in getattr(cfg, "PATIENTS", None) or ()
+        ),
+        log_file=getattr(cfg, "LOG_FILE", "pillsbot/logs/pills.csv"),
+        audit_log_file=getattr(cfg, "AUDIT_LOG_FILE", "pillsbot/logs/audit.log"),
+    )
+
+
+def validate_config(cfg: Any) -> Config:
     """Validate runtime configuration before starting the bot.
 
     v5 changes:
     - Dose time may be '*' (fire immediately after startup) OR HH:MM.
     - All other rules are preserved.
+
+    Returns the frozen Config snapshot of the validated settings.
     """
-    patients: List[Dict[str, Any]] = getattr(cfg, "PATIENTS", None)
+    patients: list[dict[str, Any]] = getattr(cfg, "PATIENTS", None)
     if not isinstance(patients, list) or not patients:
         raise ValueError("PATIENTS must be a non-empty list")
 
-    seen_keys: set[tuple[int, str]] = set()
+    measures = getattr(cfg, "MEASURES", None)
+    known_measure_ids = frozenset(measures) if isinstance(measures, dict) else frozenset()
+
+    # A large roster repeats the same few times ("08:00", "21:00", ...):
+    # check each distinct string once.
+    valid_times: set[str] = set()
+
+    def time_ok(t: Any) -> bool:
+        if isinstance(t, str) and t in valid_times:
+            return True
+        if _is_valid_hhmm(t):
+            valid_times.add(t)
+            return True
+        return False
+
     for p in patients:
-        for key in ("patient_id", "patient_label", "group_id", "nurse_user_id", "doses"):
-            if key not in p:
-                raise ValueError(f"patient missing required field: {key}")
+        missing = _REQUIRED_PATIENT_FIELDS - p.keys()
+        if missing:
+            raise ValueError(
+                f"patient missing required field: {', '.join(sorted(missing))}"
+            )
         pid = p["patient_id"]
         doses = p["doses"]
         if not isinstance(doses, list) or not doses:
             raise ValueError(f"patient {pid}: 'doses' must be a non-empty list")
 
         for d in doses:
-            if "time" not in d or "text" not in d:
+            if _REQUIRED_DOSE_FIELDS - d.keys():
                 raise ValueError(f"patient {pid}: each dose must have 'time' and 'text'")
             t = d["time"]
-            if t != "*" and not _is_valid_hhmm(t):
+            if t != _ANY_TIME and not time_ok(t):
                 raise ValueError(f"patient {pid}: invalid dose time '{t}' (expected HH:MM or '*')")
-            if t != "*":
-                # Uniqueness per patient (ignore '*' which is one-shot at startup)
-                k = (pid, t)
-                if k in seen_keys:
-                    raise ValueError(f"patient {pid}: duplicate dose time '{t}'")
-                seen_keys.add(k)
             if not str(d["text"]).strip():
                 raise ValueError(f"patient {pid}: dose 'text' must be non-empty")
 
+        # Uniqueness per patient (ignore '*' which is one-shot at startup)
+        times = [d["time"] for d in doses if d["time"] != _ANY_TIME]
+        dup = _first_duplicate(times)
+        if dup is not None:
+            raise ValueError(f"patient {pid}: duplicate dose time '{dup}'")
+
+        checks_by_measure: defaultdict[str, list[str]] = defaultdict(list)
+        for chk in p.get("measurement_checks", ()):
+            t = chk.get("time")
+            if not time_ok(t):
+                raise ValueError(f"patient {pid}: invalid measurement check time '{t}'")
+            mid = chk.get("measure_id")
+            if mid not in known_measure_ids:
+                raise ValueError(f"patient {pid}: measurement check for unknown measure '{mid}'")
+            checks_by_measure[mid].append(t)
+        for mid, check_times in checks_by_measure.items():
+            dup = _first_duplicate(check_times)
+            if dup is not None:
+                raise ValueError(
+                    f"patient {pid}: duplicate '{mid}' measurement check time '{dup}'"
+                )
+
     # Confirmation patterns
     pats = getattr(cfg, "CONFIRM_PATTERNS", None)
     if not isinstance(pats, list) or not pats or not all(isinstance(x, str) and x for x in pats):
         raise ValueError("CONFIRM_PATTERNS must be a non-empty list of strings")
+    try:
+        compile_confirm_re(pats)
+    except re.error as e:
+        raise ValueError(f"CONFIRM_PATTERNS do not compile as one alternation: {e}")
 
     # Measures (consistent with v4)
-    measures = getattr(cfg, "MEASURES", None)
     if not isinstance(measures, dict) or not measures:
         raise ValueError("MEASURES must be a non-empty dict")
     for mid, m in measures.items():
@@ -70,3 +242,8 @@ def validate_config(cfg: Any) -> None:
             raise ValueError(f"Measure '{mid}' must define non-empty 'patterns'")
         if not m.get("csv_file"):
             raise ValueError(f"Measure '{mid}' must define 'csv_file'")
+        kind = m.get("parser_kind")
+        if kind is not None and kind not in PARSERS_BY_KIND:
+            raise ValueError(f"Measure '{mid}' has unknown 'parser_kind': {kind!r}")
+
+    return load_config(cfg)
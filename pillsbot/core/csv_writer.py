@@ -0,0 +1,146 @@
+# pillsbot/core/csv_writer.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import IO, Iterable, List, Optional, Set
+
+from pillsbot.core.logging_utils import kv
+
+_CLOSE = None  # queue sentinel: drain, close the file, stop the writer task
+
+log = logging.getLogger("pillsbot.csv")
+
+# Directories already created/verified by this process (makedirs is a syscall pair)
+_ENSURED_DIRS: Set[str] = set()
+
+
+def ensure_parent_dirs(paths: Iterable[str]) -> None:
+    """Create each distinct parent directory of `paths` at most once per process."""
+    for d in {os.path.dirname(p) for p in paths} - _ENSURED_DIRS:
+        if d:
+            os.makedirs(d, exist_ok=True)
+        _ENSURED_DIRS.add(d)
+
+
+class CsvWriter:
+    """
+    Append-only CSV sink with a single background writer task per file.
+
+    * put() is non-blocking: rows are queued and the event loop never touches disk.
+    * The writer drains whatever is queued into one batch, writes it in a worker
+      thread, and flushes once the queue stays idle for `flush_interval_s`.
+    * One file handle is kept open for the process lifetime (opened lazily).
+    * A failed write/flush is logged and the handle dropped; the task keeps
+      running and the next batch reopens the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_interval_s: float = 1.0,
+        max_batch: int = 256,
+        buffering: int = 1 << 16,
+    ) -> None:
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max_batch
+        self._buffering = buffering
+        self._q: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._f: Optional[IO[str]] = None
+
+    def put(self, row: str) -> None:
+        """Queue one complete line (including the trailing newline)."""
+        self._q.put_nowait(row)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Write everything queued so far, then close the file."""
+        if self._task is None:
+            return
+        self._q.put_nowait(_CLOSE)
+        await self._task
+        self._task = None
+
+    # ---- writer task ------------------------------------------------------------
+    async def _run(self) -> None:
+        dirty = False
+        while True:
+            try:
+                row = await asyncio.wait_for(
+                    self._q.get(), self.flush_interval_s if dirty else None
+                )
+            except asyncio.TimeoutError:
+                await self._guarded(self._flush, 0)
+                dirty = False
+                continue
+
+            batch: List[str] = []
+            closing = row is _CLOSE
+            if not closing:
+                batch.append(row)
+            while not closing and len(batch) < self.max_batch:
+                try:
+                    nxt = self._q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is _CLOSE:
+                    closing = True
+                else:
+                    batch.append(nxt)
+
+            if batch:
+                dirty = await self._guarded(self._write, len(batch), batch)
+            if closing:
+                await self._guarded(self._close, 0)
+                return
+
+    async def _guarded(self, fn, rows: int, *args) -> bool:
+        """Run a blocking helper in a worker thread; log and reset on failure."""
+        try:
+            await asyncio.to_thread(fn, *args)
+            return True
+        except Exception as e:  # defensive: the writer task must outlive I/O errors
+            log.error(
+                "csv.write.error %s",
+                kv(path=self.path, op=fn.__name__, rows=rows, err=str(e)),
+            )
+            await asyncio.to_thread(self._discard)
+            return False
+
+    # ---- blocking helpers (run in worker thread) ----------------------------------
+    def _write(self, batch: List[str]) -> None:
+        if self._f is None:
+            # Not the cached helper: this runs on (re)open only, and the logs
+            # directory may have been removed since the last open
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            self._f = open(
+                self.path, "a", encoding="utf-8", buffering=self._buffering
+            )
+        self._f.writelines(batch)
+
+    def _flush(self) -> None:
+        if self._f is not None:
+            self._f.flush()
+
+    def _close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _discard(self) -> None:
+        f, self._f = self._f, None
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass  # buffered rows are already reported lost
+
+
+__all__ = ["CsvWriter", "ensure_parent_dirs"]
@@ -5,9 +5,15 @@ i18n catalog.
 
 This file preserves v4 keys and adds v5 keys + any keys used by the v4 engine
 (e.g., ack_confirm, prompt_pressure, prompt_weight).
+
+MESSAGES is a read-only view: the pre-bound renderers below are derived from it
+once at import, so mutating it at runtime would silently desync them.
 """
 
-MESSAGES = {
+from types import MappingProxyType
+from typing import Any, Mapping
+
+MESSAGES = MappingProxyType({
     # Menu texts (technical/idle)
     "reminder_text": "Час прийняти ліки. Підтвердіть прийом або оберіть дію нижче.",
     "idle_text": "Що зробимо? Оберіть дію нижче.",
@@ -36,19 +42,35 @@ MESSAGES = {
     "unknown_text": "Не вдалося розпізнати це повідомлення.",
     "prompt_pressure": "Будь ласка, надішліть вимір тиску у форматі «120/80».",
     "prompt_weight": "Будь ласка, надішліть вагу у кілограмах (наприклад, 72.4).",
-}
-
-# v5 additions
-MESSAGES.update(
-    {
-        "reminder_retry_prefix": "Нагадування {n}: ",
-        "escalate_group": "Пропущено прийом ліків!!! Повідомлення відправлено медичній медичній сестрі".replace(
-            " медичній медичній", " медичній"
-        ),  # guard against accidental dup
-        "startup_greeting": "Всім доброго дня!",
-    }
-)
-
-
-def fmt(key: str, **kwargs) -> str:
-    return MESSAGES[key].format(**kwargs)
+    # v5 additions
+    "reminder_retry_prefix": "Нагадування {n}: ",
+    "escalate_group": "Пропущено прийом ліків!!! Повідомлення відправлено медичній сестрі",
+    "startup_greeting": "Всім доброго дня!",
+})
+
+
+# Split once at import (EAFP): a template that renders with no arguments is
+# static and served from a plain dict, already rendered (so "{{" escapes are
+# resolved); anything that needs arguments gets a pre-bound format_map.
+# The bound format_map *is* the per-key cached renderer: its placeholder scan
+# runs in C, and a Python-level literal/field chunk-join closure measured no
+# faster on these short templates, so templates are not pre-split further.
+_STATIC: dict[str, str] = {}
+_RENDERERS: dict[str, Any] = {}
+for _k, _v in MESSAGES.items():
+    try:
+        _STATIC[_k] = _v.format_map({})
+    except (KeyError, IndexError, ValueError):
+        _RENDERERS[_k] = _v.format_map
+del _k, _v
+
+
+def fmt(key: str, mapping: Mapping[str, Any] | None = None, /, **kwargs: Any) -> str:
+    """
+    Render MESSAGES[key]. Values come from `mapping` (passed positionally, used
+    as-is without a ** copy) or from keyword arguments.
+    """
+    text = _STATIC.get(key)
+    if text is not None:
+        return text
+    return _RENDERERS[key](kwargs if mapping is None else mapping)
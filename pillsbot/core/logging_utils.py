@@ -4,18 +4,29 @@ from __future__ import annotations
 import logging
 import os
 from logging.handlers import RotatingFileHandler
-from typing import Any
+from typing import Any, Dict
 
 LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s — %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# One shared Formatter; handlers already installed, keyed by audit log path
+_FORMATTER = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+_CONFIGURED: Dict[str, logging.Logger] = {}
+
 
 def setup_logging(cfg: Any) -> logging.Logger:
     """
     Configure logging:
     - Console shows INFO and above (clean runtime output).
     - Audit log file stores DEBUG and above (full trace).
+
+    Idempotent per AUDIT_LOG_FILE: repeated calls return the configured logger
+    without rebuilding handlers or reopening the file.
     """
+    configured = _CONFIGURED.get(cfg.AUDIT_LOG_FILE)
+    if configured is not None:
+        return configured
+
     log_dir = os.path.dirname(cfg.AUDIT_LOG_FILE)
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
@@ -23,7 +34,7 @@ def setup_logging(cfg: Any) -> logging.Logger:
     root = logging.getLogger("pillsbot")
     root.setLevel(logging.DEBUG)  # Allow DEBUG to propagate to file handler
 
-    fmt = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    fmt = _FORMATTER
 
     # File handler — DEBUG level, full history
     fh = RotatingFileHandler(
@@ -41,9 +52,28 @@ def setup_logging(cfg: Any) -> logging.Logger:
     root.addHandler(fh)
     root.addHandler(ch)
 
+    # A different audit file replaces the handlers above; forget older entries
+    _CONFIGURED.clear()
+    _CONFIGURED[cfg.AUDIT_LOG_FILE] = root
     return root
 
 
-def kv(**kwargs: Any) -> str:
-    """Key=value compact formatting (values repr()'d for clarity)."""
-    return " ".join(f"{k}={v!r}" for k, v in kwargs.items())
+class _KV:
+    """Deferred key=value rendering: logging calls str() only if the record is emitted."""
+
+    __slots__ = ("kw",)
+
+    def __init__(self, kw: Dict[str, Any]) -> None:
+        self.kw = kw
+
+    def __str__(self) -> str:
+        return " ".join(f"{k}={v!r}" for k, v in self.kw.items())
+
+
+def kv(**kwargs: Any) -> _KV:
+    """Key=value compact formatting (values repr()'d for clarity).
+
+    Pass as a %-argument (`log.debug("event %s", kv(...))`) so suppressed levels
+    never pay for the repr() calls.
+    """
+    return _KV(kwargs)
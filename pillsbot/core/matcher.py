@@ -2,24 +2,169 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, List, Pattern
+from typing import AbstractSet, Callable, Iterable, Optional, Pattern, Tuple
+
+_FLAGS = re.IGNORECASE | re.UNICODE
+_NEVER = r"(?!)"  # empty pattern list must not match everything
+
+# ^\s*<literal>\s*$ where <literal> is plain text or escaped punctuation (e.g. \+)
+_ANCHORED_LITERAL = re.compile(
+    r"^\^\\s\*((?:\\[^A-Za-z0-9]|[^\\.^$*+?{}\[\]|()])+)\\s\*\$$"
+)
+_UNESCAPE = re.compile(r"\\(.)")
+# Zero-width lead-ins that don't consume a required character: ^  \s*  \s+  \s?  \b
+_LEAD_IN = re.compile(r"(?:\^|\\s[*+?]|\\b)*")
+_SPECIAL = frozenset(".^$*+?{}[]|()\\")
+# Cyrillic о/к → Latin o/k after casefold, so mixed-script "oк"/"оk" hit the same
+# literal as "ок" (C-level table lookup instead of an [OoОо][KkКк] regex)
+_LATINIZE = str.maketrans("ок", "ok")
+
+
+def _literal_key(s: str) -> str:
+    return s.strip().casefold().translate(_LATINIZE)
+
+
+def compile_confirm_re(patterns: Iterable[str]) -> Pattern[str]:
+    """Union all confirmation patterns into ONE compiled alternation."""
+    union = "|".join(f"(?:{p})" for p in patterns)
+    return re.compile(union or _NEVER, _FLAGS)
+
+
+def _required_first_char(pattern: str) -> Optional[str]:
+    """First character every match of `pattern` must contain, or None if unsure."""
+    if "|" in pattern:
+        return None  # alternation: branches may start differently
+    rest = pattern[_LEAD_IN.match(pattern).end() :]
+    if rest[:1] == "\\" and len(rest) > 1 and not rest[1].isalnum():
+        ch, after = rest[1], rest[2:3]
+    elif rest and rest[0] not in _SPECIAL:
+        ch, after = rest[0], rest[1:2]
+    else:
+        return None
+    if after and after in "*?{":
+        return None  # optional / counted: not guaranteed to be present
+    return ch
+
+
+def compile_confirm_gate(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """
+    One-character-class prefilter for the residual regexes: if no character that
+    some pattern requires occurs in the text, none of them can match. Compiled
+    with the same flags so case folding is exactly the main regex's. None when
+    any pattern has no safely extractable required character.
+    """
+    chars: set[str] = set()
+    for p in patterns:
+        ch = _required_first_char(p)
+        if ch is None:
+            return None
+        chars.add(ch)
+    if not chars:
+        return None
+    return re.compile(f"[{''.join(re.escape(c) for c in sorted(chars))}]", _FLAGS)
+
+
+def split_confirm_patterns(
+    patterns: Iterable[str],
+) -> Tuple[frozenset[str], Tuple[str, ...]]:
+    """
+    Partition patterns into whole-message literals (casefolded) and the residual
+    real regexes. `^\\s*так\\s*$` is equivalent to `text.strip().casefold() == "так"`,
+    so such entries become a set lookup instead of a regex search. Literal keys
+    are also latinized (о/к), so Cyrillic/Latin lookalikes compare equal.
+    """
+    literals: set[str] = set()
+    residual: list[str] = []
+    for p in patterns:
+        m = _ANCHORED_LITERAL.match(p)
+        if m:
+            literals.add(_literal_key(_UNESCAPE.sub(r"\1", m.group(1))))
+        else:
+            residual.append(p)
+    return frozenset(literals), tuple(residual)
+
+
+def _specialize(
+    literals: AbstractSet[str],
+    rx: Optional[Pattern[str]],
+    gate: Optional[Pattern[str]] = None,
+) -> Callable[[str], bool]:
+    """Pick a classifier closure for this pattern set once, so the per-message
+    path carries no branches for parts that are absent (no codegen/eval)."""
+    if rx is None:
+        if not literals:
+            # Empty pattern list: nothing can confirm, skip normalization too
+            return lambda text: False
+
+        def classify(text: str) -> bool:
+            return _literal_key(text) in literals
+
+        return classify
+
+    search = rx.search
+    if gate is not None:
+        # Cheap char-class scan first; the full alternation only runs on texts
+        # that contain at least one character some pattern needs.
+        gated, inner = gate.search, search
+
+        def search(text: str) -> Optional[re.Match[str]]:
+            return inner(text) if gated(text) is not None else None
+
+    if not literals:
+
+        def classify(text: str) -> bool:
+            return search(text) is not None
+
+        return classify
+
+    def classify(text: str) -> bool:
+        return _literal_key(text) in literals or search(text) is not None
+
+    return classify
 
 
 class Matcher:
     """
     Regex-based confirmation matcher (Unicode + case-insensitive).
     All matching semantics live in the provided patterns (see config.CONFIRM_PATTERNS).
-    No input normalization or pattern rewriting happens here.
+    No input normalization or pattern rewriting happens here beyond two lossless
+    shortcuts: whole-message literal patterns are answered by a set lookup, and
+    the remaining patterns are joined into a single alternation.
     """
 
     def __init__(self, patterns: Iterable[str]) -> None:
-        flags = re.IGNORECASE | re.UNICODE
-        self._compiled: List[Pattern[str]] = [re.compile(p, flags) for p in patterns]
+        literals, residual = split_confirm_patterns(patterns)
+        self._literals: AbstractSet[str] = literals
+        self._rx: Optional[Pattern[str]] = (
+            compile_confirm_re(residual) if residual else None
+        )
+        self._gate: Optional[Pattern[str]] = compile_confirm_gate(residual)
+        self._classify = _specialize(self._literals, self._rx, self._gate)
+
+    @classmethod
+    def from_compiled(
+        cls,
+        literals: AbstractSet[str],
+        rx: Optional[Pattern[str]],
+        gate: Optional[Pattern[str]] = None,
+    ) -> "Matcher":
+        """Build from pre-split/pre-compiled parts (see config_validation.Config)."""
+        self = cls.__new__(cls)
+        self._literals = literals
+        self._rx = rx
+        self._gate = gate
+        self._classify = _specialize(literals, rx, gate)
+        return self
 
     def matches_confirmation(self, text: str | None) -> bool:
         if not text:
             return False
-        return any(rx.search(text) for rx in self._compiled)
+        return self._classify(text)
 
 
-__all__ = ["Matcher"]
+__all__ = [
+    "Matcher",
+    "compile_confirm_gate",
+    "compile_confirm_re",
+    "split_confirm_patterns",
+]
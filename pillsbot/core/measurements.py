@@ -3,20 +3,123 @@ from __future__ import annotations
 
 import os
 import re
+import threading
 from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from pillsbot.core.csv_writer import ensure_parent_dirs
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class MeasureDef:
     id: str
     label: str
     patterns: List[str]
     csv_file: str
-    parser_kind: str  # legacy hints: "int2" | "float1"
+    parser_kind: str  # "int2" | "float1" (resolved to a parser at registry build)
     separators: Optional[List[str]] = None  # legacy for pressure
     decimal_commas: Optional[bool] = None  # legacy for weight
+    parse: Optional[Callable[[str], Dict[str, Any]]] = None
+
+    @classmethod
+    def from_config(cls, mid: str, m: Dict[str, Any]) -> "MeasureDef":
+        """Build from a raw MEASURES entry, resolving 'parser_kind' to its parser."""
+        kind = m.get("parser_kind", "")
+        return cls(
+            id=mid,
+            label=m["label"],
+            patterns=m["patterns"],
+            csv_file=m["csv_file"],
+            parser_kind=kind,
+            separators=m.get("separators"),
+            decimal_commas=m.get("decimal_commas"),
+            parse=PARSERS_BY_KIND.get(kind),
+        )
+
+
+# has_today: files below this size are scanned front-to-back (one read anyway)
+_TAIL_SCAN_MIN_SIZE = 64 * 1024
+_TAIL_CHUNK = 8 * 1024
+
+_HEADERS: Dict[str, str] = {
+    "pressure": "date_time_local,patient_id,patient_label,systolic,diastolic,pulse\n",
+    "weight": "date_time_local,patient_id,patient_label,weight\n",
+}
+
+
+def _csv_header(measure_id: str, n_values: int) -> str:
+    header = _HEADERS.get(measure_id)
+    if header is None:
+        cols = ",".join(f"value{i + 1}" for i in range(n_values))
+        header = f"date_time_local,patient_id,patient_label,{cols}\n"
+    return header
+
+
+def _fmt_day(d: date) -> str:
+    # "%Y-%m-%d" without strftime's per-call format parsing
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+
+def _fmt_minute(dt: datetime) -> str:
+    # "%Y-%m-%d %H:%M" (CSV timestamp column)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
+RowFormatter = Callable[[str, int, str, tuple], str]
+
+
+def _pressure_row(ts: str, pid: int, label: str, values: tuple) -> str:
+    # Fixed schema: a missing pulse (or diastolic) leaves its column blank
+    if len(values) == 3:
+        sys_v, dia_v, pulse_v = values
+        return f"{ts},{pid},{label},{sys_v},{dia_v},{pulse_v}\n"
+    if len(values) == 2:
+        sys_v, dia_v = values
+        return f"{ts},{pid},{label},{sys_v},{dia_v},\n"
+    return f"{ts},{pid},{label},,,\n"
+
+
+def _weight_row(ts: str, pid: int, label: str, values: tuple) -> str:
+    (w,) = values
+    return f"{ts},{pid},{label},{w}\n"
+
+
+def _generic_row(ts: str, pid: int, label: str, values: tuple) -> str:
+    vals = ",".join(str(x) for x in values)
+    return f"{ts},{pid},{label},{vals}\n"
+
+
+_ROW_FORMATTERS: Dict[str, RowFormatter] = {
+    "pressure": _pressure_row,
+    "weight": _weight_row,
+}
+
+
+# Tail of the start-anchored dispatch: body runs to end of line, and the line
+# must be the last one (same semantics as "(?P<body>.+)?$" in a single regex).
+_BODY_TAIL = re.compile(r"(.+)?$", re.UNICODE)
+_DISPATCH_FLAGS = re.IGNORECASE | re.UNICODE
+
+
+@lru_cache(maxsize=None)
+def _build_dispatch_rx(
+    patterns_by_measure: Tuple[Tuple[str, ...], ...],
+) -> Optional[re.Pattern[str]]:
+    r"""
+    ^\s*(?:(kw1|kw2)|(kw3|...))\b[:\-]?\s*  — one call resolves the keyword for
+    every measure at once; match() then runs _BODY_TAIL from m.end() (two regex
+    calls per keyworded message, one for the rest). The tail stays separate so
+    lastindex keeps naming the measure. Alternation order preserves "first
+    configured measure wins". Capture group N is the N-th configured measure.
+    Cached on the keyword tuples, so registries rebuilt from the same config
+    share one compiled pattern.
+    """
+    if not patterns_by_measure:
+        return None
+    parts = (f"({'|'.join(map(re.escape, pats))})" for pats in patterns_by_measure)
+    return re.compile(rf"^\s*(?:{'|'.join(parts)})\b[:\-]?\s*", _DISPATCH_FLAGS)
 
 
 class MeasurementRegistry:
@@ -29,29 +132,38 @@ class MeasurementRegistry:
     * 'has_today' helper for daily checks.
     """
 
-    def __init__(self, tz, measures_cfg: Dict[str, Dict[str, Any]] | None = None):
+    def __init__(
+        self,
+        tz,
+        measures_cfg: Dict[str, Dict[str, Any] | MeasureDef] | None = None,
+    ):
         self.tz = tz
         self.measures: Dict[str, MeasureDef] = {}
-        self._compiled: Dict[str, re.Pattern[str]] = {}
+        # capture group index (1, 2, ...) → measure_id for the dispatch regex
+        self._group_to_mid: Dict[int, str] = {}
+        # measure_id → CSV row formatter, chosen once by schema
+        self._row_fmt: Dict[str, RowFormatter] = {}
         measures_cfg = measures_cfg or {}
-        flags = re.IGNORECASE | re.UNICODE
-
-        for mid, m in measures_cfg.items():
-            md = MeasureDef(
-                id=mid,
-                label=m["label"],
-                patterns=m["patterns"],
-                csv_file=m["csv_file"],
-                parser_kind=m.get("parser_kind", ""),
-                separators=m.get("separators"),
-                decimal_commas=m.get("decimal_commas"),
-            )
+
+        for i, (mid, m) in enumerate(measures_cfg.items(), start=1):
+            md = m if isinstance(m, MeasureDef) else MeasureDef.from_config(mid, m)
             self.measures[mid] = md
-            # ^\s*(kw1|kw2|...)\b[:\-]?\s*(?P<body>.*)?$
-            union = "|".join(re.escape(p) for p in md.patterns)
-            self._compiled[mid] = re.compile(
-                rf"^\s*(?:{union})\b[:\-]?\s*(?P<body>.+)?$", flags
-            )
+            self._group_to_mid[i] = mid
+            self._row_fmt[mid] = _ROW_FORMATTERS.get(mid, _generic_row)
+
+        # measure_id → (day, patient_ids with a row that day); filled lazily by
+        # has_today, kept current by append_csv. Assumes this process is the
+        # only writer of the measure CSVs.
+        self._today_seen: Dict[str, Tuple[date, Set[int]]] = {}
+        # measure_ids whose CSV is known to exist with a header (see append_csv)
+        self._header_written: Set[str] = set()
+        # append_csv / has_today may run in worker threads (asyncio.to_thread);
+        # the lock keeps a hydrating read from racing an append.
+        self._io_lock = threading.Lock()
+
+        self._dispatch: Optional[re.Pattern[str]] = _build_dispatch_rx(
+            tuple(tuple(md.patterns) for md in self.measures.values())
+        )
 
     def available(self) -> List[str]:
         return list(self.measures.keys())
@@ -59,15 +171,25 @@ class MeasurementRegistry:
     def get_label(self, measure_id: str) -> str:
         return self.measures[measure_id].label
 
+    def parser_for(
+        self, measure_id: str, default: Callable[[str], Dict[str, Any]]
+    ) -> Callable[[str], Dict[str, Any]]:
+        """Parser resolved from 'parser_kind' at build time (or `default`)."""
+        md = self.measures.get(measure_id)
+        return (md.parse if md else None) or default
+
     # ---- Dispatch by typed keyword (start-anchored) ----
     def match(self, text: str | None) -> Optional[Tuple[str, str]]:
         t = text or ""
-        for mid, rx in self._compiled.items():
-            m = rx.match(t)
-            if m:
-                body = (m.group("body") or "").strip()
-                return mid, body
-        return None
+        if self._dispatch is None:
+            return None
+        m = self._dispatch.match(t)
+        if m is None:
+            return None
+        tail = _BODY_TAIL.match(t, m.end())
+        if tail is None:
+            return None
+        return self._group_to_mid[m.lastindex], (tail.group(1) or "").strip()
 
     # ---- CSV writing ----
     def append_csv(
@@ -87,63 +209,109 @@ class MeasurementRegistry:
         """
         md = self.measures[measure_id]
         path = md.csv_file
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        is_new = not os.path.exists(path)
-
-        with open(path, "a", encoding="utf-8") as f:
-            if is_new:
-                if measure_id == "pressure":
-                    f.write(
-                        "date_time_local,patient_id,patient_label,systolic,diastolic,pulse\n"
-                    )
-                elif measure_id == "weight":
-                    f.write("date_time_local,patient_id,patient_label,weight\n")
-                else:
-                    cols = ",".join(f"value{i + 1}" for i in range(len(values)))
-                    f.write(f"date_time_local,patient_id,patient_label,{cols}\n")
-
-            ts = dt_local.strftime("%Y-%m-%d %H:%M")
-            if measure_id == "pressure":
-                if len(values) == 3:
-                    sys_v, dia_v, pulse_v = values
-                    f.write(f"{ts},{patient_id},{patient_label},{sys_v},{dia_v},{pulse_v}\n")
-                elif len(values) == 2:
-                    sys_v, dia_v = values
-                    f.write(f"{ts},{patient_id},{patient_label},{sys_v},{dia_v},\n")
-                else:
-                    f.write(f"{ts},{patient_id},{patient_label},,,\n")
-            elif measure_id == "weight":
-                (w,) = values
-                f.write(f"{ts},{patient_id},{patient_label},{w}\n")
-            else:
-                vals = ",".join(str(x) for x in values)
-                f.write(f"{ts},{patient_id},{patient_label},{vals}\n")
+        ts = _fmt_minute(dt_local)
+        row = self._row_fmt[measure_id](ts, patient_id, patient_label, values)
+
+        with self._io_lock:
+            header = ""
+            if measure_id not in self._header_written:
+                # First write for this measure in this process: make sure the
+                # directory exists and add the header if the file is new. Later
+                # appends skip both stat calls.
+                ensure_parent_dirs((path,))
+                if not os.path.exists(path):
+                    header = _csv_header(measure_id, len(values))
+                self._header_written.add(measure_id)
+            # One encode + one write per append (header folded into the payload)
+            try:
+                f = open(path, "ab")
+            except FileNotFoundError:
+                # Directory removed while running (log cleanup): recreate it
+                # and start the file with its header again
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                header = _csv_header(measure_id, len(values))
+                f = open(path, "ab")
+            with f:
+                f.write((header + row).encode("utf-8"))
+
+            seen = self._today_seen.get(measure_id)
+            if seen is not None and seen[0] == dt_local.date():
+                seen[1].add(patient_id)
 
     # ---- Daily check helper ----
     def has_today(self, measure_id: str, patient_id: int, date_local: date) -> bool:
-        md = self.measures[measure_id]
-        path = md.csv_file
-        if not os.path.exists(path):
-            return False
+        with self._io_lock:
+            seen = self._today_seen.get(measure_id)
+            if seen is None or seen[0] != date_local:
+                # First check for this measure/day: read the CSV once, then answer
+                # from memory (append_csv keeps the set current).
+                path = self.measures[measure_id].csv_file
+                seen = (date_local, self._pids_on(path, date_local))
+                self._today_seen[measure_id] = seen
+            return patient_id in seen[1]
+
+    def _pids_on(self, path: str, date_local: date) -> Set[int]:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return set()
+        if size < _TAIL_SCAN_MIN_SIZE:
+            return self._pids_on_linear(path, date_local)
+        return self._pids_on_tail(path, size, date_local)
+
+    @staticmethod
+    def _row_pid(line: str, date_local: date) -> Optional[int]:
+        """patient_id of a CSV row dated `date_local`, else None."""
+        parts = line.strip().split(",")
+        if len(parts) < 3:
+            return None
+        try:
+            dt = datetime.strptime(parts[0].strip(), "%Y-%m-%d %H:%M")
+            pid = int(parts[1].strip())
+        except Exception:
+            return None
+        return pid if dt.date() == date_local else None
+
+    def _pids_on_linear(self, path: str, date_local: date) -> Set[int]:
+        pids: Set[int] = set()
         with open(path, "r", encoding="utf-8") as f:
             _ = f.readline()  # header
+            prefix = _fmt_day(date_local)
             for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                parts = line.split(",")
-                if len(parts) < 3:
-                    continue
-                dt_str = parts[0].strip()
-                pid_str = parts[1].strip()
-                try:
-                    dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-                    pid = int(pid_str)
-                except Exception:
+                # Cheap date-prefix filter; strptime only runs on that day's rows
+                if not line.startswith(prefix):
                     continue
-                if pid == patient_id and dt.date() == date_local:
-                    return True
-        return False
+                pid = self._row_pid(line, date_local)
+                if pid is not None:
+                    pids.add(pid)
+        return pids
+
+    def _pids_on_tail(self, path: str, size: int, date_local: date) -> Set[int]:
+        """
+        Rows are appended in time order, so read the file backwards in chunks and
+        stop at the first row dated before `date_local` (I/O ~ today's rows only).
+        """
+        target = _fmt_day(date_local).encode("ascii")
+        pids: Set[int] = set()
+        with open(path, "rb") as f:
+            pos = size
+            carry = b""  # partial first line of the previous (later) chunk
+            while pos > 0:
+                step = min(_TAIL_CHUNK, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + carry).split(b"\n")
+                # lines[0] may be cut mid-row unless we've reached the file start
+                carry = lines.pop(0) if pos > 0 else b""
+                for raw in reversed(lines):
+                    day = raw[:10]
+                    if day == target:
+                        pid = self._row_pid(raw.decode("utf-8", "replace"), date_local)
+                        if pid is not None:
+                            pids.add(pid)
+                    elif day < target and day[:1].isdigit():
+                        return pids
+        return pids
 
 
 # ======================================================================================
@@ -152,62 +320,55 @@ class MeasurementRegistry:
 
 _INT_RE = re.compile(r"(?<!\d)(\d{1,3})(?!\d)")
 _FLOAT_RE = re.compile(r"(?<!\d)(\d{1,3}(?:[.,]\d{1,2})?)(?!\d)")
+# Pressure separators → space in one C-level pass (was a chain of 5 .replace calls)
+_PRESSURE_SEP_TABLE = str.maketrans({"/": " ", "-": " ", "—": " ", "–": " ", ":": " "})
+_NA_RE = re.compile(r"\bна\b", re.IGNORECASE | re.UNICODE)
+_KG_RE = re.compile(r"\s*(?:кг|kg)\b", re.IGNORECASE | re.UNICODE)
+# Unit, "на" and decimal tokens in one alternation (for classify_and_parse)
+_FREE_TOKEN_RE = re.compile(
+    r"(?P<kg>(?:кг|kg)\b)|(?P<na>\bна\b)|(?<!\d)(?P<num>\d{1,3}(?:[.,]\d{1,2})?)(?!\d)",
+    re.IGNORECASE | re.UNICODE,
+)
 
 
-def parse_pressure_free(text: str) -> Dict[str, Any]:
+def _pressure_in_range(sys_v: int, dia_v: int, pulse_v: Optional[int]) -> bool:
+    return (
+        70 <= sys_v <= 250
+        and 40 <= dia_v <= 150
+        and (pulse_v is None or 30 <= pulse_v <= 220)
+    )
+
+
+def validate_pressure_bulk(
+    rows: Iterable[Tuple[int, int, Optional[int]]],
+) -> List[bool]:
     """
-    Accepts:
-      - 120/80
-      - 120 80
-      - 120-80
-      - 120 на 80
-      - optional 3rd number as pulse: "... 72"
-    Returns:
-      {"ok": True, "sys": int, "dia": int, "pulse": Optional[int]}
-      or {"ok": False, "error": "one_number"|"range"|"unrecognized"}
+    Range-check many (sys, dia, pulse) readings at once, e.g. rows re-read from
+    pressure.csv. Same limits as the chat parser; pulse may be None.
     """
-    t = (text or "").strip()
-    # Normalize separators "на" and punctuation to space to make number extraction robust
-    t = (
-        t.replace("/", " ")
-        .replace("-", " ")
-        .replace("—", " ")
-        .replace("–", " ")
-        .replace(":", " ")
-    )
-    t = re.sub(r"\bна\b", " ", t, flags=re.IGNORECASE | re.UNICODE)
+    return [_pressure_in_range(s, d, p) for s, d, p in rows]
 
-    nums = [int(m.group(1)) for m in _INT_RE.finditer(t)]
+
+def _pressure_result(nums: List[str]) -> Dict[str, Any]:
+    """Range-checked pressure result from the extracted integer tokens."""
     if len(nums) == 1:
         return {"ok": False, "error": "one_number"}
     if len(nums) < 2:
         return {"ok": False, "error": "unrecognized"}
 
-    sys_v = nums[0]
-    dia_v = nums[1]
-    pulse_v = nums[2] if len(nums) >= 3 else None
+    sys_s, dia_s, *rest = nums
+    sys_v = int(sys_s)
+    dia_v = int(dia_s)
+    pulse_v = int(rest[0]) if rest else None
 
-    # Range checks
-    if not (70 <= sys_v <= 250) or not (40 <= dia_v <= 150):
-        return {"ok": False, "error": "range"}
-    if pulse_v is not None and not (30 <= pulse_v <= 220):
+    if not _pressure_in_range(sys_v, dia_v, pulse_v):
         return {"ok": False, "error": "range"}
 
     return {"ok": True, "sys": sys_v, "dia": dia_v, "pulse": pulse_v}
 
 
-def parse_weight_free(text: str) -> Dict[str, Any]:
-    """
-    Accepts one numeric token (dot or comma decimal), units optional (кг/kg).
-    Returns:
-      {"ok": True, "kg": float} or
-      {"ok": False, "error": "likely_pressure"|"range"|"unrecognized"}
-    """
-    t = (text or "").strip()
-    # Strip units
-    t = re.sub(r"\s*(кг|kg)\b", "", t, flags=re.IGNORECASE | re.UNICODE)
-    nums = [m.group(1) for m in _FLOAT_RE.finditer(t)]
-
+def _weight_result(nums: List[str]) -> Dict[str, Any]:
+    """Range-checked weight result from the extracted decimal tokens."""
     if len(nums) == 0:
         return {"ok": False, "error": "unrecognized"}
     if len(nums) > 1:
@@ -224,3 +385,92 @@ def parse_weight_free(text: str) -> Dict[str, Any]:
         return {"ok": False, "error": "range"}
 
     return {"ok": True, "kg": v}
+
+
+def parse_pressure_free(text: str) -> Dict[str, Any]:
+    """
+    Accepts:
+      - 120/80
+      - 120 80
+      - 120-80
+      - 120 на 80
+      - optional 3rd number as pulse: "... 72"
+    Returns:
+      {"ok": True, "sys": int, "dia": int, "pulse": Optional[int]}
+      or {"ok": False, "error": "one_number"|"range"|"unrecognized"}
+    """
+    # Normalize separators "на" and punctuation to space to make number extraction
+    # robust: one translate pass + one regex sub (no strip needed, only digits count)
+    t = _NA_RE.sub(" ", (text or "").translate(_PRESSURE_SEP_TABLE))
+
+    # findall → plain strings (no Match objects); only the used ones go through int()
+    return _pressure_result(_INT_RE.findall(t))
+
+
+def parse_weight_free(text: str) -> Dict[str, Any]:
+    """
+    Accepts one numeric token (dot or comma decimal), units optional (кг/kg).
+    Returns:
+      {"ok": True, "kg": float} or
+      {"ok": False, "error": "likely_pressure"|"range"|"unrecognized"}
+    """
+    t = (text or "").strip()
+    # Strip units
+    t = _KG_RE.sub("", t)
+    return _weight_result(_FLOAT_RE.findall(t))
+
+
+def _split_pressure_pair(tok: str) -> Tuple[str, ...]:
+    """
+    "120,80" -> ("120", "80") when it reads as pressure, else (tok,).
+
+    A comma is both a pressure separator and a decimal mark, so only a pair
+    with a two-digit tail, sys >= 90 and sys > dia is split; lower pairs such
+    as "72,50" or "85,60" are far likelier to be a weight.
+    """
+    whole, sep, frac = tok.partition(",")
+    if sep and len(frac) == 2:
+        sys_v, dia_v = int(whole), int(frac)
+        if sys_v >= 90 and sys_v > dia_v and _pressure_in_range(sys_v, dia_v, None):
+            return whole, frac
+    return (tok,)
+
+
+def classify_and_parse(text: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse free text whose measure is not known yet, in ONE regex pass.
+
+    Returns ("weight", result) if a кг/kg unit is present or the text holds a
+    single number (and no "на"); otherwise ("pressure", result). Without a unit,
+    a comma pair that reads as a plausible reading ("120,80": sys >= 90 and
+    sys > dia, both in range) counts as two numbers, matching
+    parse_pressure_free's separators; "72,50" stays a two-decimal weight.
+    Results have the same shape and range checks as parse_weight_free /
+    parse_pressure_free.
+    """
+    nums: List[str] = []
+    has_unit = has_na = False
+    for m in _FREE_TOKEN_RE.finditer(text or ""):
+        kind = m.lastgroup
+        if kind == "num":
+            nums.append(m.group("num"))
+        elif kind == "kg":
+            has_unit = True
+        else:
+            has_na = True
+
+    if not has_unit:
+        nums = [p for tok in nums for p in _split_pressure_pair(tok)]
+    if has_unit or (len(nums) == 1 and not has_na):
+        return "weight", _weight_result(nums)
+    # Pressure takes integers only: a "120.5" token counts as 120 and 5, as in
+    # parse_pressure_free
+    ints = [p for tok in nums for p in tok.replace(",", ".").split(".")]
+    return "pressure", _pressure_result(ints)
+
+
+# parser_kind -> free-form parser; resolved once per measure in MeasurementRegistry
+PARSERS_BY_KIND: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "int2": parse_pressure_free,
+    "float1": parse_weight_free,
+}
@@ -2,14 +2,23 @@
 from __future__ import annotations
 
 import asyncio
-import contextlib
 import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Optional, Dict, Set, Tuple, List
-from zoneinfo import ZoneInfo
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Optional,
+    Dict,
+    Tuple,
+    List,
+    Protocol,
+)
 
+from pillsbot.core.config_validation import Config, Patient, load_config
+from pillsbot.core.csv_writer import CsvWriter
 from pillsbot.core.matcher import Matcher
 from pillsbot.core.i18n import fmt, MESSAGES
 from pillsbot.core.logging_utils import kv
@@ -29,6 +38,15 @@ from pillsbot.core.reminder_messaging import ReminderMessenger
 from pillsbot.core.reminder_retry import RetryManager
 
 
+_HELP_KEYWORDS = frozenset({"help", "?", "довідка"})
+# parser error code → reply template (anything else → the *_unrec template)
+_PRESSURE_ERRORS = {"one_number": "err_pressure_one", "range": "err_pressure_range"}
+_WEIGHT_ERRORS = {
+    "likely_pressure": "err_weight_likely_pressure",
+    "range": "err_weight_range",
+}
+
+
 # -------------------------------------------------------------------------------------------------
 # Public inbound message type (kept here for backwards-compat imports in tests)
 # -------------------------------------------------------------------------------------------------
@@ -40,6 +58,28 @@ class IncomingMessage:
     sent_at_utc: datetime
 
 
+class MessageSink(Protocol):
+    """Outbound surface the engine needs from an adapter (see TelegramAdapter)."""
+
+    async def send_group_message(
+        self, group_id: int, text: str, reply_markup: Any | None = None
+    ) -> Any: ...
+
+    async def send_nurse_dm(self, user_id: int, text: str) -> None: ...
+
+
+class _NullSink:
+    """Placeholder sink until the real adapter is attached; sending is a bug."""
+
+    async def send_group_message(
+        self, group_id: int, text: str, reply_markup: Any | None = None
+    ) -> Any:
+        raise RuntimeError("engine has no adapter attached")
+
+    async def send_nurse_dm(self, user_id: int, text: str) -> None:
+        raise RuntimeError("engine has no adapter attached")
+
+
 class ReminderEngine:
     """
     v4: Single dynamic inline menu (delete old → post new). The engine ensures that
@@ -50,49 +90,72 @@ class ReminderEngine:
     one-shot expectation per chat). No long-lived sessions.
     """
 
-    def __init__(self, config: Any, adapter: Any | None, clock: Optional[Clock] = None):
+    def __init__(
+        self,
+        config: Any,
+        adapter: MessageSink | None = None,
+        clock: Optional[Clock] = None,
+    ):
         self.cfg = config
-        self.adapter = adapter
-        tz = getattr(config, "TZ", None) or ZoneInfo(
-            getattr(config, "TIMEZONE", "Europe/Kyiv")
-        )
+        # Frozen snapshot: hot paths read slots instead of module attributes
+        self.settings: Config = load_config(config)
+        self.adapter: MessageSink = adapter if adapter is not None else _NullSink()
+        tz = self.settings.tz
         self.clock = clock or Clock(tz)
 
         # Core services
-        self.matcher = Matcher(getattr(config, "CONFIRM_PATTERNS", []))
-        self.measures = MeasurementRegistry(tz, getattr(config, "MEASURES", None))
+        self.matcher = Matcher.from_compiled(
+            self.settings.confirm_literals,
+            self.settings.confirm_re,
+            self.settings.confirm_gate,
+        )
+        self.measures = MeasurementRegistry(tz, self.settings.measures)
+        self._parse_pressure = self.measures.parser_for("pressure", parse_pressure_free)
+        self._parse_weight = self.measures.parser_for("weight", parse_weight_free)
         self.log = logging.getLogger("pillsbot.engine")
+        # measure_id → inbound text handler (tap expectation and typed keyword)
+        self._measure_handlers: Dict[
+            str, Callable[[Patient, str, datetime], Awaitable[None]]
+        ] = {
+            "pressure": self._handle_pressure_text,
+            "weight": self._handle_weight_text,
+        }
 
         # State & messaging
         self.state_mgr = ReminderState(tz, self.clock)
         self.messenger = ReminderMessenger(adapter=self.adapter, log=self.log)
-        self._escalated: Set[DoseKey] = set()
+        self._outcome_log = CsvWriter(self.settings.log_file)
 
-        self.patient_index: Dict[int, dict] = {}
+        self.patient_index: Dict[int, Patient] = {}
         self.group_to_patient: Dict[int, int] = {}
+        # Routing key for inbound traffic: group_id → Patient in ONE probe
+        self.patient_by_group: Dict[int, Patient] = {}
 
         self.retry_mgr: Optional[RetryManager] = None
 
-        # One-shot expectation for next user message after a tap: {"pressure"|"weight"}
+        # One-shot expectation for next user message after a tap: {"pressure"|"weight"}.
+        # No lock: it is only touched between awaits on the event loop, the tap writes
+        # it before any send, and the message path consumes it with a single pop().
         self._expect_next: Dict[int, str] = {}  # keyed by group_id
 
-    def attach_adapter(self, adapter: Any) -> None:
+    def attach_adapter(self, adapter: MessageSink) -> None:
         self.adapter = adapter
         self.messenger.adapter = adapter
-        self.log.debug("engine.adapter.attached " + kv(kind=type(adapter).__name__))
+        self.log.debug("engine.adapter.attached %s", kv(kind=type(adapter).__name__))
 
     async def start(self, scheduler: Any | None) -> None:
         # Build indices & pre-create state for today
-        for p in getattr(self.cfg, "PATIENTS", []):
-            pid = p["patient_id"]
+        for p in self.settings.patients:
+            pid = p.patient_id
             self.patient_index[pid] = p
-            self.group_to_patient[p["group_id"]] = pid
+            self.group_to_patient[p.group_id] = pid
+            self.patient_by_group[p.group_id] = p
             self.state_mgr.ensure_today_instances(p)
 
         # Wire retry manager
         self.retry_mgr = RetryManager(
-            interval_seconds=int(getattr(self.cfg, "RETRY_INTERVAL_S", 30)),
-            max_attempts=int(getattr(self.cfg, "MAX_RETRY_ATTEMPTS", 3)),
+            interval_seconds=self.settings.retry_interval_s,
+            max_attempts=self.settings.max_retry_attempts,
             send_repeat=self._send_repeat_wrapper,
             on_escalate=self._on_escalate_wrapper,
             set_status=self.state_mgr.set_status,
@@ -103,21 +166,21 @@ class ReminderEngine:
         # Optional legacy scheduler passthrough (kept for compatibility)
         if scheduler is not None:
             try:
-                for p in getattr(self.cfg, "PATIENTS", []):
-                    for d in p["doses"]:
+                for p in self.settings.patients:
+                    for d in p.doses:
                         scheduler.add_job(
                             self._start_dose_job,
                             kwargs={
-                                "patient_id": p["patient_id"],
-                                "time_str": d["time"],
+                                "patient_id": p.patient_id,
+                                "time_str": d.time,
                             },
                         )
-                    for chk in p.get("measurement_checks", []):
+                    for chk in p.measurement_checks:
                         scheduler.add_job(
                             self._job_measure_check,
                             kwargs={
-                                "patient_id": p["patient_id"],
-                                "measure_id": chk["measure_id"],
+                                "patient_id": p.patient_id,
+                                "measure_id": chk.measure_id,
                             },
                         )
             except Exception:
@@ -127,19 +190,22 @@ class ReminderEngine:
     # ---- incoming from adapter --------------------------------------------------------
     async def on_patient_message(self, msg: IncomingMessage) -> None:
         self.log.info(
-            "msg.engine.in "
-            + kv(
+            "msg.engine.in %s",
+            kv(
                 group_id=msg.group_id,
                 sender_user_id=msg.sender_user_id,
                 text=(msg.text or ""),
             )
         )
 
-        pid = self.group_to_patient.get(msg.group_id)
-        if pid is None or pid != msg.sender_user_id:
+        # Any inbound text now sits below the menu
+        self.messenger.forget_menu(msg.group_id)
+
+        patient = self.patient_by_group.get(msg.group_id)
+        if patient is None or patient.patient_id != msg.sender_user_id:
             self.log.debug(
-                "msg.engine.reject "
-                + kv(
+                "msg.engine.reject %s",
+                kv(
                     reason="patient-only",
                     group_id=msg.group_id,
                     sender_user_id=msg.sender_user_id,
@@ -147,47 +213,48 @@ class ReminderEngine:
             )
             return
 
-        patient = self.patient_index[pid]
         text = (msg.text or "").strip()
-        group_id = patient["group_id"]
+        group_id = patient.group_id
+        # One clock read per inbound message (target selection, CSV row, menu)
+        now = self.clock.now()
+        today = self.clock.date_str(now)
+
+        # Nothing to dispatch on; keep any pending expectation, just re-post the menu
+        if not text:
+            await self._menu_for(patient, today)
+            return
 
         # --- A) Confirmation via text (CRITICAL INTENT) ---
-        if self.matcher.matches_confirmation(text.lower().strip()):
-            await self._handle_confirmation_text(patient)
+        # Matcher folds case itself (casefolded literals + IGNORECASE regex)
+        if self.matcher.matches_confirmation(text):
+            await self._handle_confirmation_text(patient, today)
             return
 
         # --- B) Help commands ---
-        if text.lower() in {"help", "?", "довідка"}:
-            await self.show_help(group_id)
+        if text.lower() in _HELP_KEYWORDS:
+            await self._reply_in_menu(patient, "help_text", today)
             return
 
         # --- C) One-shot expectation set by a recent tap (pressure/weight) ---
         expect = self._expect_next.pop(group_id, None)
-        if expect == "pressure":
-            await self._handle_pressure_text(patient, text)
-            await self.show_current_menu(group_id)
-            return
-        if expect == "weight":
-            await self._handle_weight_text(patient, text)
-            await self.show_current_menu(group_id)
+        handler = self._measure_handlers.get(expect) if expect else None
+        if handler is not None:
+            await self._with_fresh_menu(patient, handler(patient, text, now), today)
             return
 
         # --- D) Typed keywords (start-anchored), then tolerant parse on the body ---
         mm = self.measures.match(text)
         if mm:
             mid, body = mm
-            if mid == "pressure":
-                await self._handle_pressure_text(patient, body)
-                await self.show_current_menu(group_id)
-                return
-            if mid == "weight":
-                await self._handle_weight_text(patient, body)
-                await self.show_current_menu(group_id)
+            handler = self._measure_handlers.get(mid)
+            if handler is not None:
+                await self._with_fresh_menu(
+                    patient, handler(patient, body, now), today
+                )
                 return
 
         # --- E) Fallback ---
-        await self._reply(group_id, "unknown_text")
-        await self.show_current_menu(group_id)
+        await self._reply_in_menu(patient, "unknown_text", today)
 
     # ---- menus / actions --------------------------------------------------------------
     async def show_current_menu(self, group_id: int) -> None:
@@ -196,45 +263,38 @@ class ReminderEngine:
         - If a dose is actively AWAITING → show reminder text + menu with Confirm.
         - Otherwise → show idle text + menu without Confirm.
         """
-        pid = self.group_to_patient.get(group_id)
-        if pid is None:
-            return
-        patient = self.patient_index.get(pid)
-        if not patient:
-            return
-
-        target = self.state_mgr.select_target_for_confirmation(
-            self.clock.now(), patient
+        patient = self.patient_by_group.get(group_id)
+        if patient is not None:
+            await self._menu_for(patient)
+
+    async def _menu_for(self, patient: Patient, today: Optional[str] = None) -> None:
+        """show_current_menu for callers that already resolved the patient."""
+        target = self.state_mgr.select_awaiting_target(
+            patient, today or self.clock.today_str()
         )
-
-        if target and self.state_mgr.status(target) == Status.AWAITING:
+        if target is not None:
             await self.messenger.send_reminder_step(target)
             return
 
-        await self.messenger.send_home_step(group_id, can_confirm=False)
+        await self.messenger.send_home_step(patient.group_id, can_confirm=False)
 
     async def show_hint_menu(self, group_id: int, *, kind: str) -> None:
         """
         Show the short hint (pressure/weight) with the inline menu in ONE message,
         and set a one-shot expectation for the very next patient message.
         """
-        pid = self.group_to_patient.get(group_id)
-        if pid is None:
-            return
-        patient = self.patient_index.get(pid)
-        if not patient:
-            return
+        patient = self.patient_by_group.get(group_id)
+        if patient is not None:
+            await self._hint_menu_for(patient, kind)
 
-        # Set expectation
-        if kind in {"pressure", "weight"}:
+    async def _hint_menu_for(
+        self, patient: Patient, kind: str, today: Optional[str] = None
+    ) -> None:
+        group_id = patient.group_id
+        # Set expectation before any await, so a racing message already sees it
+        if kind in self._measure_handlers:
             self._expect_next[group_id] = kind
 
-        # Can we show confirm row?
-        target = self.state_mgr.select_target_for_confirmation(
-            self.clock.now(), patient
-        )
-        can_confirm = bool(target and self.state_mgr.status(target) == Status.AWAITING)
-
         # Which hint text?
         text = (
             MESSAGES["prompt_pressure"]
@@ -242,61 +302,82 @@ class ReminderEngine:
             else MESSAGES["prompt_weight"]
         )
 
-        await self.messenger.send_menu(group_id, text=text, can_confirm=can_confirm)
+        await self.messenger.send_menu(
+            group_id, text=text, can_confirm=self._can_confirm(patient, today)
+        )
+
+    def _can_confirm(self, patient: Patient, today: Optional[str] = None) -> bool:
+        """Whether the menu should carry the Confirm row (a dose is AWAITING)."""
+        target = self.state_mgr.select_awaiting_target(
+            patient, today or self.clock.today_str()
+        )
+        return target is not None
 
     async def quick_confirm(self, group_id: int, from_user_id: int) -> None:
         """Handle '✅ TAKE' tap; patient-only is enforced upstream in adapter."""
-        pid = self.group_to_patient.get(group_id)
-        if pid is None or pid != from_user_id:
-            return
-        patient = self.patient_index.get(pid)
-        if not patient:
+        patient = self.patient_by_group.get(group_id)
+        if patient is None or patient.patient_id != from_user_id:
             return
         await self._handle_confirmation_text(patient)
 
     async def show_help(self, group_id: int) -> None:
-        await self._reply(group_id, "help_text")
-        await self.show_current_menu(group_id)
+        patient = self.patient_by_group.get(group_id)
+        if patient is None:
+            await self._reply(group_id, "help_text")
+            return
+        await self._reply_in_menu(patient, "help_text")
 
     # ---- jobs / orchestration ----------------------------------------------------------
     async def _start_dose_job(self, *, patient_id: int, time_str: str) -> None:
         patient = self.patient_index.get(patient_id)
         if not patient:
             self.log.debug(
-                "job.trigger.miss "
-                + kv(reason="unknown patient", patient_id=patient_id)
+                "job.trigger.miss %s",
+                kv(reason="unknown patient", patient_id=patient_id)
             )
             return
 
-        key = DoseKey(patient_id, self.clock.today_str(), time_str)
+        # Normally pre-created by start() / the rotation job; a 00:00 dose can fire
+        # before rotation (same-instant jobs run in id order) or rotation may misfire.
+        key = (patient_id, self.clock.today_str(), time_str)
         inst = self.state_mgr.get(key)
         if inst is None:
-            self.state_mgr.ensure_today_instances(patient)
+            self.state_mgr.ensure_today_instances(patient, recurring_only=True)
             inst = self.state_mgr.get(key)
             if inst is None:
                 self.log.error(
-                    "job.trigger.miss "
-                    + kv(
-                        patient_id=patient_id,
-                        time=time_str,
-                        reason="state not created",
-                    )
+                    "job.trigger.miss %s",
+                    kv(patient_id=patient_id, time=time_str, reason="state not created")
                 )
                 return
 
         if self.state_mgr.status(inst) == Status.CONFIRMED:
             self.log.debug(
-                "job.trigger.skip "
-                + kv(patient_id=patient_id, time=time_str, reason="confirmed")
+                "job.trigger.skip %s",
+                kv(patient_id=patient_id, time=time_str, reason="confirmed")
             )
             return
 
-        self.state_mgr.set_status(inst, Status.AWAITING)
-        inst.attempts_sent = 1
+        self.state_mgr.transition(inst, Status.AWAITING)
 
         await self.messenger.send_reminder_step(inst)
         await self._start_retry(inst)
 
+    async def _job_rotate_day(self) -> None:
+        """
+        Midnight job: pre-create the new day's DoseInstances for every patient and
+        drop earlier days, so the state map stays one day wide. A retry still in
+        flight for a dropped dose keeps its own reference and finishes normally.
+        """
+        today = self.clock.today_str()
+        dropped = self.state_mgr.drop_before(today)
+        for p in self.settings.patients:
+            self.state_mgr.ensure_today_instances(p, recurring_only=True)
+        self.log.debug(
+            "job.rotate_day %s",
+            kv(date=today, patients=len(self.settings.patients), dropped=dropped)
+        )
+
     # --- IMPORTANT: robust measurement check entry points ---
     async def _start_measurement_check_job(
         self, *, patient_id: int, measure_id: str
@@ -315,20 +396,26 @@ class ReminderEngine:
         patient = self.patient_index.get(patient_id)
         if not patient:
             self.log.debug(
-                "job.measure.miss "
-                + kv(reason="unknown patient", patient_id=patient_id)
+                "job.measure.miss %s",
+                kv(reason="unknown patient", patient_id=patient_id)
             )
             return
 
-        today = self.clock.now().date()
-        if self.measures.has_today(measure_id, patient_id, today):
+        now = self.clock.now()
+        today = now.date()
+        # CSV reads happen in a worker thread so other chats aren't stalled on disk
+        if await asyncio.to_thread(
+            self.measures.has_today, measure_id, patient_id, today
+        ):
             # NEW: include last time and values for today in the INFO log
-            last = self._read_today_last_measure(measure_id, patient_id, today)
+            last = await asyncio.to_thread(
+                self._read_today_last_measure, measure_id, patient_id, today
+            )
             if last:
                 dt_local, values = last
                 self.log.info(
-                    "measure.check.skip "
-                    + kv(
+                    "measure.check.skip %s",
+                    kv(
                         patient_id=patient_id,
                         measure_id=measure_id,
                         reason="has_today",
@@ -339,34 +426,29 @@ class ReminderEngine:
             else:
                 # Fallback if CSV could not be parsed (still explain skip)
                 self.log.info(
-                    "measure.check.skip "
-                    + kv(
+                    "measure.check.skip %s",
+                    kv(
                         patient_id=patient_id, measure_id=measure_id, reason="has_today"
                     )
                 )
             return
 
-        group_id = patient["group_id"]
+        group_id = patient.group_id
         # Post a contentful hint via the menu (arms one-shot expectation)
         self.log.info(
-            "measure.check.prompt " + kv(patient_id=patient_id, measure_id=measure_id)
+            "measure.check.prompt %s", kv(patient_id=patient_id, measure_id=measure_id)
         )
-        await self.show_hint_menu(group_id, kind=measure_id)
+        await self._hint_menu_for(patient, measure_id, self.clock.date_str(now))
 
     # ---- retry glue -------------------------------------------------------------------
     async def _start_retry(self, inst: DoseInstance) -> None:
         if self.retry_mgr is None:
             return
-        await self._stop_retry(inst)
-        inst.retry_task = asyncio.create_task(self.retry_mgr.run(inst))
+        self.retry_mgr.schedule(inst)  # replaces any pending retry for this dose
 
     async def _stop_retry(self, inst: DoseInstance) -> None:
-        t = inst.retry_task
-        if t and not t.done():
-            t.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await t
-        inst.retry_task = None
+        if self.retry_mgr is not None:
+            self.retry_mgr.cancel(inst)
 
     async def _send_repeat_wrapper(self, inst: DoseInstance) -> None:
         # v4: final pre-send status check — if not AWAITING, do not send the retry.
@@ -376,41 +458,34 @@ class ReminderEngine:
 
     async def _on_escalate_wrapper(self, inst: DoseInstance) -> None:
         # Send escalation messages & menu
-        await self.messenger.send_escalation(inst) if hasattr(
-            self.messenger, "send_escalation"
-        ) else None
-        self._escalated.add(inst.dose_key)
+        await self.messenger.send_escalation(inst)
+        inst.escalated = True
         self._log_outcome_csv(inst, "escalated")
         await self.show_current_menu(inst.group_id)
 
     # ---- confirmation handling ---------------------------------------------------------
-    async def _handle_confirmation_text(self, patient: dict) -> None:
-        now = self.clock.now()
-        target = self.state_mgr.select_target_for_confirmation(now, patient)
+    async def _handle_confirmation_text(
+        self, patient: Patient, today: Optional[str] = None
+    ) -> None:
+        today = today or self.clock.today_str()
         # Only allow confirmation when a dose is actively awaiting.
-        if (not target) or (self.state_mgr.status(target) != Status.AWAITING):
-            await self._reply(patient["group_id"], "unknown_text")
-            await self.show_current_menu(patient["group_id"])
-            return
-
-        # Idempotent confirm
-        if self.state_mgr.status(target) == Status.CONFIRMED:
-            await self._reply(patient["group_id"], "ack_confirm")
-            await self.show_current_menu(patient["group_id"])
+        target = self.state_mgr.select_awaiting_target(patient, today)
+        if target is None:
+            await self._reply_in_menu(patient, "unknown_text", today)
             return
+        self.state_mgr.transition(target, Status.CONFIRMED)
 
-        self.state_mgr.set_status(target, Status.CONFIRMED)
         await self._stop_retry(target)
         self.log.info(
-            "dose.confirm "
-            + kv(
+            "dose.confirm %s",
+            kv(
                 patient_id=target.patient_id,
                 time=target.dose_key.time_str,
                 source="tap/text",
             )
         )
 
-        if target.dose_key in self._escalated:
+        if target.escalated:
             await self.messenger.send_nurse_notice(
                 target.nurse_user_id,
                 fmt(
@@ -421,29 +496,30 @@ class ReminderEngine:
                     pill_text=target.pill_text,
                 ),
             )
-            self._escalated.discard(target.dose_key)
+            target.escalated = False
 
         self._log_outcome_csv(target, "confirmed")
 
         # Ack + refresh menu without confirm
-        await self._reply(patient["group_id"], "ack_confirm")
-        await self.show_current_menu(patient["group_id"])
+        await self._reply_and_refresh(patient, "ack_confirm", today=today)
 
     # ---- measurement handling ----------------------------------------------------------
-    async def _handle_pressure_text(self, patient: dict, text: str) -> None:
-        parsed = parse_pressure_free(text)
-        gid = patient["group_id"]
+    async def _handle_pressure_text(
+        self, patient: Patient, text: str, now_local: datetime
+    ) -> None:
+        parsed = self._parse_pressure(text)
+        gid = patient.group_id
         if parsed.get("ok"):
-            now_local = self.clock.now()
             sys_v = parsed["sys"]
             dia_v = parsed["dia"]
             pulse_v = parsed.get("pulse")
             vals = (sys_v, dia_v) if pulse_v is None else (sys_v, dia_v, pulse_v)
-            self.measures.append_csv(
+            await asyncio.to_thread(
+                self.measures.append_csv,
                 "pressure",
                 now_local,
-                patient["patient_id"],
-                patient["patient_label"],
+                patient.patient_id,
+                patient.patient_label,
                 vals,
             )
             if pulse_v is None:
@@ -458,35 +534,27 @@ class ReminderEngine:
                 )
         else:
             err = parsed.get("error")
-            if err == "one_number":
-                await self._reply(gid, "err_pressure_one")
-            elif err == "range":
-                await self._reply(gid, "err_pressure_range")
-            else:
-                await self._reply(gid, "err_pressure_unrec")
+            await self._reply(gid, _PRESSURE_ERRORS.get(err, "err_pressure_unrec"))
 
-    async def _handle_weight_text(self, patient: dict, text: str) -> None:
-        parsed = parse_weight_free(text)
-        gid = patient["group_id"]
+    async def _handle_weight_text(
+        self, patient: Patient, text: str, now_local: datetime
+    ) -> None:
+        parsed = self._parse_weight(text)
+        gid = patient.group_id
         if parsed.get("ok"):
-            now_local = self.clock.now()
             kg = parsed["kg"]
-            self.measures.append_csv(
+            await asyncio.to_thread(
+                self.measures.append_csv,
                 "weight",
                 now_local,
-                patient["patient_id"],
-                patient["patient_label"],
+                patient.patient_id,
+                patient.patient_label,
                 (kg,),
             )
             await self._reply(gid, "ack_weight", kg=kg)
         else:
             err = parsed.get("error")
-            if err == "likely_pressure":
-                await self._reply(gid, "err_weight_likely_pressure")
-            elif err == "range":
-                await self._reply(gid, "err_weight_range")
-            else:
-                await self._reply(gid, "err_weight_unrec")
+            await self._reply(gid, _WEIGHT_ERRORS.get(err, "err_weight_unrec"))
 
     # ---- plain replies ---------------------------------------------------------------
     async def _reply(
@@ -497,6 +565,43 @@ class ReminderEngine:
             group_id, template_key, **fmt_args
         )
 
+    async def _reply_in_menu(
+        self, patient: Patient, template_key: str, today: Optional[str] = None
+    ) -> None:
+        """
+        Transient guidance (help / unrecognised input) rides inside the menu message,
+        like the pressure/weight hints: one post replaces the old menu, instead of a
+        separate line followed by a delete + re-post. Contentful acks stay lines.
+        """
+        await self.messenger.send_menu(
+            patient.group_id,
+            text=fmt(template_key),
+            can_confirm=self._can_confirm(patient, today),
+        )
+
+    async def _with_fresh_menu(
+        self, patient: Patient, send: Awaitable[Any], today: Optional[str] = None
+    ) -> None:
+        """
+        Run `send` (content lines) while the old menu is deleted, then post the
+        current menu. The delete and the send are independent round-trips, so
+        they overlap; the new menu still lands after the content.
+        """
+        await asyncio.gather(send, self.messenger.drop_menu(patient.group_id))
+        await self._menu_for(patient, today)
+
+    async def _reply_and_refresh(
+        self,
+        patient: Patient,
+        template_key: str,
+        *,
+        today: Optional[str] = None,
+        **fmt_args: Any,
+    ) -> None:
+        await self._with_fresh_menu(
+            patient, self._reply(patient.group_id, template_key, **fmt_args), today
+        )
+
     # ---- CSV helper for richer logs (self-contained; no changes to measurements.py) ---
     def _read_today_last_measure(
         self, measure_id: str, patient_id: int, today_date
@@ -508,8 +613,7 @@ class ReminderEngine:
         """
         # Resolve CSV path from config
         try:
-            mdef = getattr(self.cfg, "MEASURES", {})[measure_id]
-            path = mdef.get("csv_file")
+            path = self.measures.measures[measure_id].csv_file
         except Exception:
             return None
 
@@ -567,13 +671,16 @@ class ReminderEngine:
     # ---- misc -------------------------------------------------------------------------
     def _log_outcome_csv(self, inst: DoseInstance, status: str) -> None:
         line = (
-            f"{inst.scheduled_dt_local.strftime('%Y-%m-%d %H:%M')}, "
-            f"{inst.patient_id}, {inst.patient_label}, {inst.pill_text}, {status}, {inst.attempts_sent}\n"
+            f"{inst.scheduled_str}, {inst.patient_id}, {inst.patient_label}, "
+            f"{inst.pill_text}, {status}, {inst.attempts_sent}\n"
         )
-        path = getattr(self.cfg, "LOG_FILE", "pillsbot/logs/pills.csv")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(line)
+        self._outcome_log.put(line)
+
+    async def aclose(self) -> None:
+        """Stop the retry pump and flush buffered outcome rows (call on shutdown)."""
+        if self.retry_mgr is not None:
+            await self.retry_mgr.aclose()
+        await self._outcome_log.aclose()
 
     @property
     def state(self):
@@ -1,7 +1,7 @@
 # pillsbot/core/reminder_messaging.py
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Dict, Tuple
 from datetime import datetime
 
 from pillsbot.core.i18n import MESSAGES, fmt
@@ -19,10 +19,14 @@ class ReminderMessenger:
     def __init__(self, adapter: Any, log: Any) -> None:
         self.adapter = adapter
         self.log = log
+        # group_id → (text, can_confirm) of the menu currently at the bottom of the chat
+        self._menu_sig: Dict[int, Tuple[str, bool]] = {}
+        self._menu_msg_id: Dict[int, int] = {}
 
     # ------------------- low-level -------------------
     async def send_group_line(self, group_id: int, text: str) -> int:
         """Send a raw, contentful line (persistent)."""
+        self.forget_menu(group_id)  # the line lands below the menu
         return await self.adapter.send_group_message(group_id, text)
 
     async def send_group_template(self, group_id: int, key: str, **kwargs) -> int:
@@ -32,8 +36,7 @@ class ReminderMessenger:
         """
         # Prefer explicit key lookup; if missing, fall back to formatting the key itself.
         try:
-            text_tmpl = MESSAGES[key]
-            text = text_tmpl.format(**kwargs)
+            text = fmt(key, **kwargs)
         except KeyError:
             # Fallback: allow directly passing arbitrary templates through the same path.
             text = key.format(**kwargs) if kwargs else key
@@ -46,20 +49,45 @@ class ReminderMessenger:
         Adapter API compatibility:
         - Prefer v4-style 'post_menu(...)' if present.
         - Otherwise, fall back to 'send_menu_message(...)' if provided by the adapter.
+
+        No-op when the identical menu is still the last message in the chat.
         """
-        if hasattr(self.adapter, "post_menu"):
-            # v4 adapter API
-            return await self.adapter.post_menu(
-                group_id, text=text, can_confirm=can_confirm
-            )
-        elif hasattr(self.adapter, "send_menu_message"):
-            # v5 adapter wrapper (if present)
-            return await self.adapter.send_menu_message(
-                group_id, text, can_confirm=can_confirm
-            )
-        raise AttributeError(
-            "Adapter must provide 'post_menu' or 'send_menu_message' for menus"
-        )
+        sig = (text, can_confirm)
+        if self._menu_sig.get(group_id) == sig:
+            return self._menu_msg_id.get(group_id, 0)
+
+        # Recorded up front so a line sent while the post is in flight invalidates it
+        self._menu_sig[group_id] = sig
+        try:
+            if hasattr(self.adapter, "post_menu"):
+                # v4 adapter API
+                msg_id = await self.adapter.post_menu(
+                    group_id, text=text, can_confirm=can_confirm
+                )
+            elif hasattr(self.adapter, "send_menu_message"):
+                # v5 adapter wrapper (if present)
+                msg_id = await self.adapter.send_menu_message(
+                    group_id, text, can_confirm=can_confirm
+                )
+            else:
+                raise AttributeError(
+                    "Adapter must provide 'post_menu' or 'send_menu_message' for menus"
+                )
+        except BaseException:
+            self.forget_menu(group_id)
+            raise
+        self._menu_msg_id[group_id] = msg_id
+        return msg_id
+
+    def forget_menu(self, group_id: int) -> None:
+        """Something was posted below the menu; the next send_menu must re-post."""
+        self._menu_sig.pop(group_id, None)
+
+    async def drop_menu(self, group_id: int) -> None:
+        """Delete the current menu ahead of a refresh (no-op if the adapter can't)."""
+        self.forget_menu(group_id)
+        if hasattr(self.adapter, "delete_menu"):
+            await self.adapter.delete_menu(group_id)
 
     async def send_nurse_notice(self, nurse_user_id: int, text: str) -> None:
         await self.adapter.send_nurse_dm(nurse_user_id, text)
@@ -99,10 +127,12 @@ class ReminderMessenger:
         dt: datetime = getattr(inst, "scheduled_dt_local", datetime.now())
         txt = fmt(
             "escalate_dm",
-            patient_label=getattr(inst, "patient_label", ""),
-            date=dt.strftime("%Y-%m-%d"),
-            time=dt.strftime("%H:%M"),
-            pill_text=getattr(inst, "pill_text", ""),
+            {
+                "patient_label": getattr(inst, "patient_label", ""),
+                "date": dt.strftime("%Y-%m-%d"),
+                "time": dt.strftime("%H:%M"),
+                "pill_text": getattr(inst, "pill_text", ""),
+            },
         )
         await self.send_nurse_notice(getattr(inst, "nurse_user_id", 0), txt)
 
@@ -2,15 +2,24 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Callable, Awaitable
+import heapq
+import itertools
+from typing import Callable, Awaitable, Dict, List, Optional, Tuple
 from pillsbot.core.logging_utils import kv
-from pillsbot.core.reminder_state import Status, DoseInstance
+from pillsbot.core.reminder_state import Status, DoseInstance, DoseKey
+
+_DONE = (Status.CONFIRMED, Status.ESCALATED)
 
 
 class RetryManager:
     """
-    Runs the retry loop for a DoseInstance, escalating at the end.
+    Drives retries for all DoseInstances, escalating at the end.
     Keeps all timing policy here so engines stay small and testable.
+
+    One pump task serves every active dose: pending retries sit in a min-heap
+    keyed by their loop.time() deadline. cancel() only forgets the entry's
+    sequence number; stale heap entries are skipped when they come due (same
+    lazy-cancel scheme as asyncio's TimerHandle / the stdlib `sched` module).
     """
 
     def __init__(
@@ -32,47 +41,106 @@ class RetryManager:
         self.get_status = get_status
         self.log = logger
 
-    async def run(self, inst: DoseInstance) -> None:
+        self._heap: List[Tuple[float, int, DoseInstance]] = []
+        self._live: Dict[DoseKey, int] = {}  # dose_key → seq of its current entry
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._pump_task: Optional[asyncio.Task] = None
+
+    # ---- public API -------------------------------------------------------------------
+    def schedule(self, inst: DoseInstance) -> None:
+        """(Re)arm the next retry for `inst` one interval from now."""
+        loop = asyncio.get_running_loop()
+        seq = next(self._seq)
+        self._live[inst.dose_key] = seq
+        heapq.heappush(self._heap, (loop.time() + self.interval_seconds, seq, inst))
+        self._wake.set()
+        if self._pump_task is None:
+            self._pump_task = loop.create_task(self._pump())
+
+    def cancel(self, inst: DoseInstance) -> None:
+        """Drop any pending retry for `inst` (O(1); the heap entry goes stale)."""
+        self._live.pop(inst.dose_key, None)
+
+    async def aclose(self) -> None:
+        """Stop the pump task (pending retries are discarded)."""
+        t, self._pump_task = self._pump_task, None
+        if t is not None and not t.done():
+            t.cancel()
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+
+    # ---- pump -------------------------------------------------------------------------
+    async def _pump(self) -> None:
+        loop = asyncio.get_running_loop()
+        heap = self._heap
+        while True:
+            self._wake.clear()
+            if not heap:
+                await self._wake.wait()
+                continue
+            delay = heap[0][0] - loop.time()
+            if delay > 0:
+                # Sleep until the earliest deadline, or until schedule() adds one
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = loop.time()
+            due: List[DoseInstance] = []
+            while heap and heap[0][0] <= now:
+                _, seq, inst = heapq.heappop(heap)
+                if self._live.get(inst.dose_key) == seq:
+                    del self._live[inst.dose_key]
+                    due.append(inst)
+            if due:
+                await asyncio.gather(*(self._fire(inst) for inst in due))
+
+    async def _fire(self, inst: DoseInstance) -> None:
         """
-        Retry until confirmed or attempts exhausted. On exhaustion, escalate.
-        Final pre-send status check happens in send_repeat wrapper.
+        One retry step: escalate once attempts are exhausted, otherwise send a
+        repeat and re-arm. Final pre-send status check happens in send_repeat.
         """
         try:
-            while self.get_status(inst) not in (Status.CONFIRMED, Status.ESCALATED):
-                await asyncio.sleep(self.interval_seconds)
-
-                if self.get_status(inst) in (Status.CONFIRMED, Status.ESCALATED):
-                    break
-
-                inst.attempts_sent += 1
-                if inst.attempts_sent > self.max_attempts:
-                    self.set_status(inst, Status.ESCALATED)
-                    self.log.info(
-                        "retry.escalate "
-                        + kv(
-                            patient_id=inst.patient_id,
-                            time=inst.dose_key.time_str,
-                            attempts=inst.attempts_sent,
-                        )
-                    )
-                    await self.on_escalate(inst)
-                    break
-
-                self.log.debug(
-                    "retry.repeat "
-                    + kv(
+            if self.get_status(inst) in _DONE:
+                return
+
+            inst.attempts_sent += 1
+            if inst.attempts_sent > self.max_attempts:
+                self.set_status(inst, Status.ESCALATED)
+                self.log.info(
+                    "retry.escalate %s",
+                    kv(
                         patient_id=inst.patient_id,
                         time=inst.dose_key.time_str,
-                        attempt=inst.attempts_sent,
-                    )
+                        attempts=inst.attempts_sent,
+                    ),
                 )
-                await self.send_repeat(inst)
-        except asyncio.CancelledError:
-            raise
+                await self.on_escalate(inst)
+                return
+
+            self.log.debug(
+                "retry.repeat %s",
+                kv(
+                    patient_id=inst.patient_id,
+                    time=inst.dose_key.time_str,
+                    attempt=inst.attempts_sent,
+                ),
+            )
+            await self.send_repeat(inst)
         except Exception as e:  # defensive
             self.log.error(
-                "retry.loop.error "
-                + kv(
+                "retry.loop.error %s",
+                kv(
                     patient_id=inst.patient_id, time=inst.dose_key.time_str, err=str(e)
-                )
+                ),
             )
+            return
+
+        # Confirmed (or re-armed by a new dose job) while the repeat was in flight
+        if self.get_status(inst) not in _DONE and inst.dose_key not in self._live:
+            self.schedule(inst)
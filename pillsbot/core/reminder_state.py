@@ -1,13 +1,15 @@
 # pillsbot/core/reminder_state.py
 from __future__ import annotations
 
-import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property
 from enum import Enum
-from typing import Dict, Optional, Tuple, Iterable
+from typing import Dict, NamedTuple, Optional, Tuple, Iterable
 from zoneinfo import ZoneInfo
 
+from pillsbot.core.config_validation import Patient
+
 
 class Status(str, Enum):
     PENDING = "pending"
@@ -16,9 +18,13 @@ class Status(str, Enum):
     ESCALATED = "escalated"
 
 
-@dataclass(frozen=True)
-class DoseKey:
-    """Stable identity for a single scheduled dose."""
+class DoseKey(NamedTuple):
+    """
+    Stable identity for a single scheduled dose.
+
+    A tuple subclass: hashing/equality run in C and a plain
+    (patient_id, date_str, time_str) tuple finds the same state entry.
+    """
 
     patient_id: int
     date_str: str  # YYYY-MM-DD (engine-local date string)
@@ -39,9 +45,15 @@ class DoseInstance:
     status: str = Status.PENDING.value
     attempts_sent: int = 0
     preconfirmed: bool = False
-    retry_task: Optional[asyncio.Task] = None
+    escalated: bool = False  # nurse was notified; a late confirm DMs the nurse again
     last_message_ids: list[int] = field(default_factory=list)  # debug/trace only
 
+    @cached_property
+    def scheduled_str(self) -> str:
+        """Scheduled time as "YYYY-MM-DD HH:MM" for the outcome CSV (built once)."""
+        dt = self.scheduled_dt_local
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
 
 class Clock:
     """Injectable, testable clock bound to a timezone."""
@@ -53,7 +65,12 @@ class Clock:
         return datetime.now(self.tz)
 
     def today_str(self) -> str:
-        return self.now().strftime("%Y-%m-%d")
+        return self.date_str(self.now())
+
+    @staticmethod
+    def date_str(dt: datetime) -> str:
+        """YYYY-MM-DD of `dt`, for callers that already hold a clock reading."""
+        return dt.strftime("%Y-%m-%d")
 
 
 class ReminderState:
@@ -68,7 +85,7 @@ class ReminderState:
         self._state: Dict[DoseKey, DoseInstance] = {}
 
     # -- dict-like read access for compatibility with existing tests --
-    def get(self, key: DoseKey) -> Optional[DoseInstance]:
+    def get(self, key: Tuple[int, str, str]) -> Optional[DoseInstance]:
         return self._state.get(key)
 
     def values(self) -> Iterable[DoseInstance]:
@@ -83,17 +100,24 @@ class ReminderState:
         return self._state
 
     # -- lifecycle ------------------------------------------------------
-    def ensure_today_instances(self, patient: dict) -> None:
-        """Create DoseInstance entries for today's date if missing."""
+    def ensure_today_instances(
+        self, patient: Patient, *, recurring_only: bool = False
+    ) -> None:
+        """
+        Create DoseInstance entries for today's date if missing. `recurring_only`
+        skips startup-only ('*') doses, which have no daily job after the first day.
+        """
         today = self.clock.today_str()
-        pid = patient["patient_id"]
-        group_id = patient["group_id"]
-        nurse_user_id = patient["nurse_user_id"]
-        label = patient["patient_label"]
-
-        for d in patient["doses"]:
-            t_str: str = d["time"]
-            pill_text: str = d["text"]
+        pid = patient.patient_id
+        group_id = patient.group_id
+        nurse_user_id = patient.nurse_user_id
+        label = patient.patient_label
+
+        for d in patient.doses:
+            if recurring_only and d.once:
+                continue
+            t_str: str = d.time
+            pill_text: str = d.text
             key = DoseKey(pid, today, t_str)
             if key in self._state:
                 continue
@@ -108,6 +132,16 @@ class ReminderState:
                 scheduled_dt_local=dt_local,
             )
 
+    def drop_before(self, date_str: str) -> int:
+        """
+        Forget instances scheduled before `date_str` (YYYY-MM-DD); returns how many.
+        Selection only ever looks at today, so older entries are dead weight.
+        """
+        stale = [k for k in self._state if k.date_str < date_str]
+        for k in stale:
+            del self._state[k]
+        return len(stale)
+
     # -- status helpers -------------------------------------------------
     def set_status(self, inst: DoseInstance, status: Status) -> None:
         inst.status = status.value
@@ -115,29 +149,38 @@ class ReminderState:
     def status(self, inst: DoseInstance) -> Status:
         return Status(inst.status)
 
+    def transition(self, inst: DoseInstance, new: Status) -> Status:
+        """
+        Move `inst` to `new` and return the status it had before.
+        Entering AWAITING starts a fresh attempt count.
+        """
+        prev = Status(inst.status)
+        inst.status = new.value
+        if new == Status.AWAITING:
+            inst.attempts_sent = 1
+        return prev
+
     # -- selection logic ------------------------------------------------
     def select_target_for_confirmation(
-        self, now_local: datetime, patient: dict
+        self, now_local: datetime, patient: Patient
     ) -> Optional[DoseInstance]:
         """
         Prefer actively waiting; else the nearest upcoming (same day),
         excluding already confirmed/escalated.
         """
-        pid = patient["patient_id"]
         today = self.clock.today_str()
 
         # 1) Actively waiting
-        for d in patient["doses"]:
-            key = DoseKey(pid, today, d["time"])
-            inst = self._state.get(key)
-            if inst and self.status(inst) == Status.AWAITING:
-                return inst
+        inst = self.select_awaiting_target(patient, today)
+        if inst is not None:
+            return inst
+
+        pid = patient.patient_id
 
         # 2) Nearest upcoming today (not confirmed/escalated)
         best: Tuple[Optional[DoseInstance], Optional[datetime]] = (None, None)
-        for d in patient["doses"]:
-            key = DoseKey(pid, today, d["time"])
-            inst = self._state.get(key)
+        for d in patient.doses:
+            inst = self._state.get((pid, today, d.time))
             if not inst or self.status(inst) in (Status.CONFIRMED, Status.ESCALATED):
                 continue
             dt = inst.scheduled_dt_local
@@ -146,6 +189,24 @@ class ReminderState:
 
         return best[0]
 
+    def select_awaiting_target(
+        self, patient: Patient, today: str
+    ) -> Optional[DoseInstance]:
+        """
+        The patient's AWAITING dose on `today` (YYYY-MM-DD), if any — i.e. the
+        confirmation target exactly when it is confirmable, without scanning for
+        upcoming doses. The caller supplies the date so one clock read can serve a
+        whole message.
+        """
+        pid = patient.patient_id
+        awaiting = Status.AWAITING.value
+        # Plain tuples: same hash/eq as DoseKey, cheaper to build
+        for d in patient.doses:
+            inst = self._state.get((pid, today, d.time))
+            if inst is not None and inst.status == awaiting:
+                return inst
+        return None
+
     # -- utilities ------------------------------------------------------
     def _combine(self, yyyy_mm_dd: str, hh_mm: str) -> datetime:
         y, m, d = (int(x) for x in yyyy_mm_dd.split("-"))
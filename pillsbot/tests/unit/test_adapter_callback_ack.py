@@ -38,3 +38,56 @@ async def test_on_callback_answers_spinner_and_routes(monkeypatch):
 
     assert cb.answered is True
     engine.show_hint_menu.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_non_text_message_in_patient_group_forgets_menu(monkeypatch):
+    class DummyDispatcher:
+        def __init__(self):
+            self.message = Mock()
+            self.callback_query = Mock()
+
+    monkeypatch.setattr("pillsbot.adapters.telegram_adapter.Bot", Mock())
+    monkeypatch.setattr("pillsbot.adapters.telegram_adapter.Dispatcher", DummyDispatcher)
+
+    engine = Mock()
+    adapter = TelegramAdapter("dummy", engine=engine, patient_groups=[-1])
+
+    class _Chat: id = -1
+    class _Other: id = -2
+    class _Sticker: chat = _Chat()
+    class _Elsewhere: chat = _Other()
+
+    await adapter.on_group_other(_Sticker())
+    await adapter.on_group_other(_Elsewhere())
+
+    engine.messenger.forget_menu.assert_called_once_with(-1)
+
+
+@pytest.mark.asyncio
+async def test_ids_command_in_patient_group_forgets_menu(monkeypatch):
+    class DummyDispatcher:
+        def __init__(self):
+            self.message = Mock()
+            self.callback_query = Mock()
+
+    monkeypatch.setattr("pillsbot.adapters.telegram_adapter.Bot", Mock())
+    monkeypatch.setattr("pillsbot.adapters.telegram_adapter.Dispatcher", DummyDispatcher)
+    monkeypatch.setattr(
+        "pillsbot.adapters.telegram_adapter.print_group_and_users_best_effort",
+        AsyncMock(),
+    )
+
+    engine = Mock()
+    engine.group_to_patient = {}
+    adapter = TelegramAdapter("dummy", engine=engine, patient_groups=[-1])
+
+    class _Chat: id = -1
+    class _Ids:
+        chat = _Chat()
+        text = "/ids"
+        from_user = None
+
+    await adapter.on_group_text(_Ids())
+
+    engine.messenger.forget_menu.assert_called_once_with(-1)
@@ -0,0 +1,67 @@
+# pillsbot/tests/unit/test_csv_writer.py
+import asyncio
+import shutil
+
+import pytest
+
+from pillsbot.core.csv_writer import CsvWriter
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_order_on_close(tmp_path):
+    path = tmp_path / "sub" / "out.csv"
+    w = CsvWriter(str(path))
+    for i in range(5):
+        w.put(f"row{i}\n")
+    await w.aclose()
+
+    assert path.read_text(encoding="utf-8") == "".join(f"row{i}\n" for i in range(5))
+
+
+@pytest.mark.asyncio
+async def test_idle_queue_is_flushed_without_close(tmp_path):
+    path = tmp_path / "out.csv"
+    w = CsvWriter(str(path), flush_interval_s=0.01)
+    w.put("a\n")
+    await asyncio.sleep(0.2)
+
+    assert path.read_text(encoding="utf-8") == "a\n"
+    await w.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_logged_and_later_rows_still_written(tmp_path, caplog):
+    path = tmp_path / "out.csv"
+    w = CsvWriter(str(path))
+    real_write = w._write
+    calls = 0
+
+    def flaky_write(batch):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OSError("disk full")
+        real_write(batch)
+
+    w._write = flaky_write
+    w.put("lost\n")
+    await asyncio.sleep(0.05)
+    w.put("kept\n")
+    await w.aclose()
+
+    assert path.read_text(encoding="utf-8") == "kept\n"
+    assert "csv.write.error" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_reopen_recreates_a_removed_directory(tmp_path):
+    path = tmp_path / "logs" / "out.csv"
+    w = CsvWriter(str(path))
+    w.put("a\n")
+    await w.aclose()
+    shutil.rmtree(path.parent)
+
+    w.put("b\n")
+    await w.aclose()
+
+    assert path.read_text(encoding="utf-8") == "b\n"
@@ -0,0 +1,104 @@
+# pillsbot/tests/unit/test_day_rotation.py
+import dataclasses
+from datetime import datetime, timedelta
+
+import pytest
+
+import pillsbot.config as cfg
+from pillsbot.app import _patients_with_star_replaced
+from pillsbot.core.config_validation import load_config
+from pillsbot.core.reminder_engine import ReminderEngine
+from pillsbot.core.reminder_state import Clock, Status
+
+
+class FixedClock(Clock):
+    def __init__(self, tz, now):
+        super().__init__(tz)
+        self.at = now
+
+    def now(self):
+        return self.at
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.sent = []
+
+    async def send_group_message(self, group_id, text, reply_markup=None):
+        self.sent.append(("group", group_id, text))
+
+    async def send_menu_message(self, group_id, text, *, can_confirm: bool):
+        self.sent.append(("menu", group_id, text, can_confirm))
+
+    async def send_nurse_dm(self, user_id, text):
+        self.sent.append(("dm", user_id, text))
+
+
+def make_engine(clock, doses):
+    class Cfg:
+        TZ = cfg.TZ
+        LOG_FILE = cfg.LOG_FILE
+        CONFIRM_PATTERNS = cfg.CONFIRM_PATTERNS
+        RETRY_INTERVAL_S = 60
+        MAX_RETRY_ATTEMPTS = 2
+        PATIENTS = [{
+            "patient_id": 10,
+            "patient_label": "P",
+            "group_id": -10,
+            "nurse_user_id": 20,
+            "doses": doses,
+        }]
+
+    # Same '*' substitution app.main applies before building the engine
+    settings = load_config(Cfg)
+    settings = dataclasses.replace(
+        settings,
+        patients=tuple(_patients_with_star_replaced(settings.patients, "09:00")),
+    )
+    return ReminderEngine(settings, FakeAdapter(), clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_rotation_creates_new_day_and_drops_old():
+    clock = FixedClock(cfg.TZ, datetime(2025, 1, 1, 9, 0, tzinfo=cfg.TZ))
+    eng = ReminderEngine(cfg, clock=clock)
+    await eng.start(None)
+    doses_per_day = len(eng.state_mgr.mapping)
+    assert doses_per_day > 0
+
+    clock.at += timedelta(days=1)
+    await eng._job_rotate_day()
+
+    dates = {k.date_str for k in eng.state_mgr.keys()}
+    assert dates == {"2025-01-02"}
+    assert len(eng.state_mgr.mapping) == doses_per_day
+
+
+@pytest.mark.asyncio
+async def test_midnight_dose_fires_before_rotation_on_day_two():
+    clock = FixedClock(cfg.TZ, datetime(2025, 1, 1, 9, 0, tzinfo=cfg.TZ))
+    eng = make_engine(clock, [{"time": "00:00", "text": "X"}])
+    await eng.start(None)
+
+    # Day 2, 00:00: the dose job runs before rotate_day (job-id order)
+    clock.at = datetime(2025, 1, 2, 0, 0, tzinfo=cfg.TZ)
+    await eng._start_dose_job(patient_id=10, time_str="00:00")
+    await eng.aclose()
+
+    inst = eng.state_mgr.get((10, "2025-01-02", "00:00"))
+    assert inst is not None and inst.status == Status.AWAITING.value
+    assert any(s[0] == "group" for s in eng.adapter.sent)
+
+
+@pytest.mark.asyncio
+async def test_startup_only_dose_is_not_recreated_on_later_days():
+    clock = FixedClock(cfg.TZ, datetime(2025, 1, 1, 9, 0, tzinfo=cfg.TZ))
+    eng = make_engine(
+        clock, [{"time": "*", "text": "once"}, {"time": "20:00", "text": "X"}]
+    )
+    await eng.start(None)
+    assert {k.time_str for k in eng.state_mgr.keys()} == {"09:00", "20:00"}
+
+    clock.at += timedelta(days=1)
+    await eng._job_rotate_day()
+    assert set(eng.state_mgr.keys()) == {(10, "2025-01-02", "20:00")}
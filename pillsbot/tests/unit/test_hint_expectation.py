@@ -77,3 +77,47 @@ async def test_help_takes_precedence_over_hint_expectation():
     await eng.on_patient_message(_mk_msg(gid, uid, "help"))
 
     assert any("Доступні вимірювання: тиск, вага" in t for _, _, t, *rest in eng.adapter.sent)
+
+
+@pytest.mark.asyncio
+async def test_identical_menu_is_not_reposted_until_chat_moves():
+    eng = ReminderEngine(cfg, adapter=FakeAdapter())
+    await eng.start(None)
+
+    patient = list(eng.patient_index.values())[0]
+    gid = patient["group_id"]
+    uid = patient["patient_id"]
+
+    def menus():
+        return [s for s in eng.adapter.sent if s[0] == "menu"]
+
+    await eng.show_hint_menu(gid, kind="pressure")
+    await eng.show_hint_menu(gid, kind="pressure")
+    assert len(menus()) == 1
+
+    await eng.show_hint_menu(gid, kind="weight")
+    assert len(menus()) == 2
+
+    # A patient message lands below the menu → the refresh must re-post
+    await eng.on_patient_message(_mk_msg(gid, uid, "72.5"))
+    await eng.show_hint_menu(gid, kind="weight")
+    assert len(menus()) == 4
+
+
+@pytest.mark.asyncio
+async def test_blank_message_keeps_expectation_and_only_refreshes_menu():
+    eng = ReminderEngine(cfg, adapter=FakeAdapter())
+    await eng.start(None)
+
+    patient = list(eng.patient_index.values())[0]
+    gid = patient["group_id"]
+    uid = patient["patient_id"]
+
+    await eng.show_hint_menu(gid, kind="pressure")
+    eng.adapter.sent.clear()
+
+    await eng.on_patient_message(_mk_msg(gid, uid, "   "))
+    assert [s[0] for s in eng.adapter.sent] == ["menu"]
+
+    await eng.on_patient_message(_mk_msg(gid, uid, "120 80 72"))
+    assert any("пульс 72" in t for _, _, t, *rest in eng.adapter.sent)
@@ -0,0 +1,31 @@
+# pillsbot/tests/unit/test_i18n.py
+import pytest
+
+from pillsbot.core.i18n import MESSAGES, fmt
+
+
+def test_fmt_matches_str_format_for_every_key():
+    kwargs = dict(
+        pill_text="X", patient_label="P", date="2025-01-01", time="08:00",
+        systolic=120, diastolic=80, pulse=70, n=2,
+    )
+    for key, tmpl in MESSAGES.items():
+        assert fmt(key, **kwargs) == tmpl.format(**kwargs)
+
+
+def test_fmt_static_and_unknown_keys():
+    assert fmt("idle_text") == MESSAGES["idle_text"]
+    with pytest.raises(KeyError):
+        fmt("no_such_key")
+    with pytest.raises(KeyError):
+        fmt("reminder_line")  # missing placeholder value
+
+
+def test_messages_is_read_only():
+    with pytest.raises(TypeError):
+        MESSAGES["idle_text"] = "x"  # type: ignore[index]
+
+
+def test_fmt_accepts_positional_mapping():
+    payload = {"pill_text": "X"}
+    assert fmt("reminder_line", payload) == fmt("reminder_line", pill_text="X")
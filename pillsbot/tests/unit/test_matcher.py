@@ -15,3 +15,40 @@ def test_matcher_negative_cases():
     m = Matcher([r"\bтак\b"])
     assert not m.matches_confirmation("також")  # word boundary prevents false positive
     assert not m.matches_confirmation("random text")
+
+
+def test_matcher_empty_patterns_never_match():
+    m = Matcher([])
+    assert not m.matches_confirmation("ок")
+
+
+def test_anchored_literals_use_set_lookup_with_regex_semantics():
+    m = Matcher([r"^\s*так\s*$", r"^\s*\+\s*$", r"\bok\b"])
+    assert m._rx is not None and m._rx.pattern == r"(?:\bok\b)"
+    assert m.matches_confirmation("  ТАК ")
+    assert m.matches_confirmation("+")
+    assert m.matches_confirmation("ok, done")  # residual regex still applies
+    assert not m.matches_confirmation("так, але")
+
+
+def test_latin_cyrillic_lookalikes_confirm():
+    m = Matcher(cfg.CONFIRM_PATTERNS)
+    for txt in ["ok", "OK", "oк", "Оk", "okей"]:
+        assert m.matches_confirmation(txt)
+    assert not m.matches_confirmation("oko")
+
+
+def test_confirm_gate_prefilters_residual_regexes():
+    from pillsbot.core.matcher import compile_confirm_gate
+
+    m = Matcher([r"\bприйнято\b", r"^\s*\+\+", r"^\s*так\s*$"])
+    assert m._gate is not None and m._gate.pattern == "[\\+п]"
+    assert m.matches_confirmation("вже ПРИЙНЯТО")
+    assert m.matches_confirmation("  ++")
+    assert m.matches_confirmation("так")
+    assert not m.matches_confirmation("   ")
+    assert not m.matches_confirmation("привіт")
+    # No safe required character → no gate, full regex only
+    assert compile_confirm_gate([r"(?:a|b)c"]) is None
+    assert compile_confirm_gate([r"x?y"]) is None
+    assert compile_confirm_gate([r"\d+"]) is None
@@ -1,5 +1,11 @@
 # pillsbot/tests/unit/test_measurements_parsing.py
-from pillsbot.core.measurements import MeasurementRegistry, parse_pressure_free, parse_weight_free
+from pillsbot.core.measurements import (
+    MeasurementRegistry,
+    classify_and_parse,
+    parse_pressure_free,
+    parse_weight_free,
+    validate_pressure_bulk,
+)
 from pillsbot import config as cfg
 
 
@@ -81,3 +87,109 @@ def test_weight_negative_cases_and_ranges():
 def test_start_anchored():
     reg = make_registry()
     assert reg.match("моє давление 120 80") is None
+
+
+def test_parser_kind_resolved_at_build():
+    reg = make_registry()
+    assert reg.parser_for("pressure", parse_weight_free) is parse_pressure_free
+    assert reg.parser_for("weight", parse_pressure_free) is parse_weight_free
+    assert reg.parser_for("unknown", parse_weight_free) is parse_weight_free
+
+
+def test_keyword_lookup_is_case_insensitive_and_whole_word():
+    reg = make_registry()
+    assert reg.match("ТИСК 120/80") == ("pressure", "120/80")
+    assert reg.match("Weight: 72,5") == ("weight", "72,5")
+    assert reg.match("bp120/80") is None
+
+
+def test_multiword_keywords_dispatch():
+    reg = MeasurementRegistry(
+        cfg.TZ,
+        {"sugar": {"label": "Цукор", "patterns": ["blood sugar"], "csv_file": "x.csv"}},
+    )
+    assert reg.match("Blood sugar 5.4") == ("sugar", "5.4")
+
+
+def test_dispatch_tail_must_be_last_line():
+    reg = make_registry()
+    assert reg.match("тиск\n120/80") == ("pressure", "120/80")
+    assert reg.match("тиск 120\n80") is None
+    assert reg.match("вага") == ("weight", "")
+
+
+def test_free_parsers_normalize_separators_and_units():
+    for txt in ["120 на 80", "120—80", "120–80 72", "120:80"]:
+        r = parse_pressure_free(txt)
+        assert r["ok"] and (r["sys"], r["dia"]) == (120, 80)
+    assert parse_weight_free("72,5 кг") == {"ok": True, "kg": 72.5}
+    assert parse_weight_free("80KG") == {"ok": True, "kg": 80.0}
+
+
+def test_has_today_tail_scan_matches_linear(tmp_path):
+    from datetime import date, datetime
+
+    path = tmp_path / "weight.csv"
+    reg = MeasurementRegistry(
+        cfg.TZ,
+        {"weight": {"label": "Вага", "patterns": ["вага"], "csv_file": str(path)}},
+    )
+    # Enough history to exceed the tail-scan threshold
+    for day in range(1, 29):
+        for pid in range(1, 100):
+            reg.append_csv("weight", datetime(2025, 1, day, 8, 0), pid, "P", (70.0,))
+    reg.append_csv("weight", datetime(2025, 1, 29, 9, 0), 7, "P", (71.0,))
+    assert path.stat().st_size > 64 * 1024
+
+    assert reg.has_today("weight", 7, date(2025, 1, 29))
+    assert not reg.has_today("weight", 8, date(2025, 1, 29))
+    assert reg.has_today("weight", 1, date(2025, 1, 1))
+    assert not reg.has_today("weight", 999, date(2025, 1, 1))
+    assert not reg.has_today("weight", 7, date(2025, 1, 30))
+
+
+def test_registries_from_same_config_share_dispatch_regex():
+    assert make_registry()._dispatch is make_registry()._dispatch
+
+
+def test_has_today_index_tracks_appends(tmp_path):
+    from datetime import date, datetime
+
+    path = tmp_path / "weight.csv"
+    reg = MeasurementRegistry(
+        cfg.TZ,
+        {"weight": {"label": "Вага", "patterns": ["вага"], "csv_file": str(path)}},
+    )
+    today = date(2025, 2, 1)
+    assert not reg.has_today("weight", 1, today)
+    reg.append_csv("weight", datetime(2025, 2, 1, 8, 0), 1, "P", (70.0,))
+    assert reg.has_today("weight", 1, today)
+    # Rolling over to a new day re-reads the file for that day
+    assert not reg.has_today("weight", 1, date(2025, 2, 2))
+
+
+def test_classify_and_parse_agrees_with_individual_parsers():
+    pressure_texts = [
+        "120/80", "120 на 80", "118-79 72", "120.5 80", "300/20", "abc",
+        "120,80", "120, 80",
+    ]
+    for txt in pressure_texts:
+        assert classify_and_parse(txt) == ("pressure", parse_pressure_free(txt))
+    for txt in ["72,5 кг", "80KG", "72.5", "72", "120 80 kg", "10 kg"]:
+        assert classify_and_parse(txt) == ("weight", parse_weight_free(txt))
+
+
+def test_classify_comma_pair_split_only_without_unit_and_when_plausible():
+    assert classify_and_parse("72,50 кг") == ("weight", {"ok": True, "kg": 72.5})
+    # Ambiguous comma pairs below sys 90 read as two-decimal weights
+    for txt in ["72,50", "85,60"]:
+        assert classify_and_parse(txt) == ("weight", parse_weight_free(txt))
+        assert classify_and_parse(txt)[1]["ok"]
+    assert classify_and_parse("120,80")[1] == {
+        "ok": True, "sys": 120, "dia": 80, "pulse": None
+    }
+
+
+def test_validate_pressure_bulk_uses_parser_ranges():
+    rows = [(120, 80, 72), (120, 80, None), (300, 80, None), (120, 30, 60), (120, 80, 10)]
+    assert validate_pressure_bulk(rows) == [True, True, False, False, False]
@@ -2,6 +2,7 @@
 import pytest
 from datetime import UTC, datetime
 from pillsbot.core.reminder_engine import ReminderEngine, IncomingMessage
+from pillsbot.core.reminder_state import Clock, Status
 import pillsbot.config as cfg
 
 
@@ -33,3 +34,37 @@ async def test_confirmation_without_awaiting_is_unknown():
     await eng.on_patient_message(msg)
 
     assert any("Не вдалося розпізнати" in t for _, _, t, *rest in eng.adapter.sent)
+
+
+class CountingClock(Clock):
+    def __init__(self, tz):
+        super().__init__(tz)
+        self.reads = 0
+
+    def now(self):
+        self.reads += 1
+        return super().now()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", ["так", "120/80", "щось незрозуміле"])
+async def test_one_clock_read_per_inbound_message(text):
+    clock = CountingClock(cfg.TZ)
+    eng = ReminderEngine(cfg, adapter=FakeAdapter(), clock=clock)
+    await eng.start(None)
+    p = cfg.PATIENTS[0]
+    inst = next(iter(eng.state_mgr.values()))
+    eng.state_mgr.transition(inst, Status.AWAITING)
+    eng._expect_next[p["group_id"]] = "pressure"
+
+    clock.reads = 0
+    await eng.on_patient_message(
+        IncomingMessage(
+            group_id=p["group_id"],
+            sender_user_id=p["patient_id"],
+            text=text,
+            sent_at_utc=datetime.now(UTC),
+        )
+    )
+    await eng.aclose()
+    assert clock.reads == 1
@@ -0,0 +1,75 @@
+# pillsbot/tests/unit/test_retry_semantics.py
+import asyncio
+import logging
+from datetime import datetime
+
+import pytest
+
+from pillsbot.core.reminder_retry import RetryManager
+from pillsbot.core.reminder_state import DoseInstance, DoseKey, Status
+
+
+def make_inst(pid=1):
+    return DoseInstance(
+        dose_key=DoseKey(pid, "2025-01-01", "08:00"),
+        patient_id=pid,
+        patient_label="P",
+        group_id=-pid,
+        nurse_user_id=99,
+        pill_text="X",
+        scheduled_dt_local=datetime(2025, 1, 1, 8, 0),
+        status=Status.AWAITING.value,
+        attempts_sent=1,
+    )
+
+
+def make_mgr(events, max_attempts=2):
+    async def send_repeat(inst):
+        events.append(("repeat", inst.patient_id, inst.attempts_sent))
+
+    async def on_escalate(inst):
+        events.append(("escalate", inst.patient_id, inst.attempts_sent))
+
+    def set_status(inst, st):
+        inst.status = st.value
+
+    return RetryManager(
+        0.01,
+        max_attempts,
+        send_repeat=send_repeat,
+        on_escalate=on_escalate,
+        set_status=set_status,
+        get_status=lambda inst: Status(inst.status),
+        logger=logging.getLogger("test.retry"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_one_pump_repeats_then_escalates_each_dose():
+    events = []
+    mgr = make_mgr(events)
+    a, b = make_inst(1), make_inst(2)
+    mgr.schedule(a)
+    mgr.schedule(b)
+    await asyncio.sleep(0.15)
+    await mgr.aclose()
+
+    for pid in (1, 2):
+        assert [e for e in events if e[1] == pid] == [
+            ("repeat", pid, 2),
+            ("escalate", pid, 3),
+        ]
+    assert a.status == b.status == Status.ESCALATED.value
+
+
+@pytest.mark.asyncio
+async def test_cancel_drops_pending_retry():
+    events = []
+    mgr = make_mgr(events)
+    inst = make_inst()
+    mgr.schedule(inst)
+    mgr.cancel(inst)
+    await asyncio.sleep(0.05)
+    await mgr.aclose()
+    assert events == []
+    assert inst.attempts_sent == 1
@@ -1,6 +1,8 @@
 # pillsbot/tests/unit/test_validation_config.py
 import pytest
-from pillsbot.core.config_validation import validate_config
+import dataclasses
+
+from pillsbot.core.config_validation import Config, Patient, validate_config
 from zoneinfo import ZoneInfo
 
 
@@ -32,6 +34,16 @@ def test_validate_ok():
     validate_config(CfgOk)
 
 
+def test_validate_returns_frozen_snapshot():
+    settings = validate_config(CfgOk)
+    assert isinstance(settings, Config)
+    assert settings.tz == CfgOk.TZ
+    assert settings.confirm_patterns == tuple(CfgOk.CONFIRM_PATTERNS)
+    assert settings.patients[0].patient_id == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.retry_interval_s = 1
+
+
 def test_validate_missing_measures_raises():
     class CfgBad(CfgOk):
         MEASURES = {}
@@ -51,3 +63,63 @@ def test_validate_empty_confirm_patterns_raises():
         CONFIRM_PATTERNS = []
     with pytest.raises(ValueError):
         validate_config(CfgBad)
+
+
+def test_validate_unknown_parser_kind_raises():
+    class CfgBad(CfgOk):
+        MEASURES = {
+            "pressure": dict(CfgOk.MEASURES["pressure"], parser_kind="int3"),
+        }
+    with pytest.raises(ValueError):
+        validate_config(CfgBad)
+
+
+@pytest.mark.parametrize("bad", ["24:00", "8:00", "08-00", "08:60", "０８:００"])
+def test_validate_bad_dose_time_raises(bad):
+    class CfgBad(CfgOk):
+        PATIENTS = [dict(CfgOk.PATIENTS[0], doses=[{"time": bad, "text": "Med"}])]
+    with pytest.raises(ValueError):
+        validate_config(CfgBad)
+
+
+def test_patient_is_slotted_and_keeps_item_access():
+    p = Patient.from_dict(CfgOk.PATIENTS[0])
+    assert not hasattr(p, "__dict__")
+    assert p.doses[0].time == "08:00"
+    assert p["doses"][0]["time"] == "08:00"
+    assert p.measurement_checks[0].measure_id == "pressure"
+    with pytest.raises(KeyError):
+        p["nope"]
+
+
+def test_validate_duplicate_dose_time_raises():
+    class CfgBad(CfgOk):
+        PATIENTS = [
+            dict(
+                CfgOk.PATIENTS[0],
+                doses=[{"time": "08:00", "text": "A"}, {"time": "08:00", "text": "B"}],
+            )
+        ]
+    with pytest.raises(ValueError, match="duplicate dose time"):
+        validate_config(CfgBad)
+
+
+def test_validate_duplicate_measurement_check_raises():
+    chk = {"measure_id": "pressure", "time": "21:00"}
+
+    class CfgBad(CfgOk):
+        PATIENTS = [dict(CfgOk.PATIENTS[0], measurement_checks=[chk, dict(chk)])]
+    with pytest.raises(ValueError, match="duplicate 'pressure' measurement check"):
+        validate_config(CfgBad)
+
+
+def test_validate_check_for_unknown_measure_raises():
+    class CfgBad(CfgOk):
+        PATIENTS = [
+            dict(
+                CfgOk.PATIENTS[0],
+                measurement_checks=[{"measure_id": "weight", "time": "21:00"}],
+            )
+        ]
+    with pytest.raises(ValueError, match="unknown measure 'weight'"):
+        validate_config(CfgBad)